@@ -1,8 +1,32 @@
+"""
+Convert technical-writeups/<subdir>/index.md pages to index.html.
+
+Usage:
+    python bulk-convert.py                # convert every page, one at a time
+    python bulk-convert.py --jobs 4       # convert pages in 4 worker processes
+    python bulk-convert.py --root DIR     # writeups directory (default: technical-writeups)
+    python bulk-convert.py --incremental  # rebuild only pages whose inputs changed
+    python bulk-convert.py --incremental --force  # rebuild every page, keeping sources
+
+By default each converted index.md is moved to <root>/backup/<subdir>/index.md.
+
+--incremental leaves the sources where they are, reading <subdir>/index.md
+or, for pages converted before, backup/<subdir>/index.md. <root>/.build-
+manifest.json records the hash of each page's source, of HTML_TEMPLATE and
+of the Markdown extension list it was built with, so editing the template
+rebuilds every page and a run with nothing changed only hashes the sources.
+"""
+import argparse
+import hashlib
+import json
 import os
-import markdown
-import yaml
 import re
 import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from news_harvester import atomic_write
 
 # HTML template with updated hacker theme and Highlight.js
 HTML_TEMPLATE = '''
@@ -302,6 +326,8 @@ layout: none
 
 # Function to parse front matter and content from md file
 def parse_md_file(file_path):
+    # markdown and yaml are imported where used, so a no-op incremental run never loads them
+    import yaml
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
     # Split front matter and body
@@ -318,40 +344,172 @@ def add_hr_after_headings(html_content):
     html_content = re.sub(r'(</h[1-3]>)', r'\1<hr>', html_content)
     return html_content
 
-# Main script
-root_dir = 'technical-writeups'
-backup_dir = os.path.join(root_dir, 'backup')
-
-# Create backup directory if it doesn't exist
-if not os.path.exists(backup_dir):
-    os.makedirs(backup_dir)
-
-for subdir in os.listdir(root_dir):
+MARKDOWN_EXTENSIONS = ['tables', 'fenced_code', 'codehilite']
+
+_markdown = None
+
+def render_markdown(md_content):
+    """Markdown to HTML with one converter per process; loading the extensions is the slow part"""
+    global _markdown
+    if _markdown is None:
+        import markdown
+        _markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return _markdown.reset().convert(md_content)
+
+def convert_page(root_dir, subdir, md_file=None):
+    """
+    Convert one writeup; returns what was done. Without md_file, reads
+    <subdir>/index.md and moves it to the backup folder afterwards; a
+    given md_file is left in place.
+    """
+    start = time.perf_counter()
     subdir_path = os.path.join(root_dir, subdir)
-    if os.path.isdir(subdir_path) and subdir != 'backup':
-        md_file = os.path.join(subdir_path, 'index.md')
-        if os.path.exists(md_file):
-            # Parse Markdown file
-            front_matter, md_content = parse_md_file(md_file)
-            title = front_matter.get('title', subdir.replace('-', ' ').title())
-            # Convert Markdown to HTML with extensions
-            content_html = markdown.markdown(md_content, extensions=['tables', 'fenced_code', 'codehilite'])
-            # Add <hr> after headings
-            content_html = add_hr_after_headings(content_html)
-            # Generate HTML
-            html = HTML_TEMPLATE.format(title=title, subdir=subdir, content_html=content_html)
-            # Write to index.html
-            html_file = os.path.join(subdir_path, 'index.html')
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(html)
-            print(f'Converted {md_file} to {html_file}')
-            # Move index.md to backup folder
-            backup_subdir = os.path.join(backup_dir, subdir)
-            if not os.path.exists(backup_subdir):
-                os.makedirs(backup_subdir)
-            backup_md_file = os.path.join(backup_subdir, 'index.md')
+    keep_source = md_file is not None
+    md_file = md_file or os.path.join(subdir_path, 'index.md')
+    # Parse Markdown file
+    front_matter, md_content = parse_md_file(md_file)
+    title = front_matter.get('title', subdir.replace('-', ' ').title())
+    # Convert Markdown to HTML with extensions, then add <hr> after headings
+    content_html = add_hr_after_headings(render_markdown(md_content))
+    # Generate HTML
+    html = HTML_TEMPLATE.format(title=title, subdir=subdir, content_html=content_html)
+    # Write to index.html
+    html_file = os.path.join(subdir_path, 'index.html')
+    with open(html_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    messages = [f'Converted {md_file} to {html_file}']
+    if keep_source:
+        return {'subdir': subdir, 'messages': messages, 'seconds': time.perf_counter() - start}
+    # Move index.md to backup folder
+    backup_subdir = os.path.join(root_dir, 'backup', subdir)
+    os.makedirs(backup_subdir, exist_ok=True)
+    backup_md_file = os.path.join(backup_subdir, 'index.md')
+    try:
+        shutil.move(md_file, backup_md_file)
+        messages.append(f'Moved {md_file} to {backup_md_file}')
+    except Exception as e:
+        messages.append(f'Failed to move {md_file} to {backup_md_file}: {e}')
+    return {'subdir': subdir, 'messages': messages, 'seconds': time.perf_counter() - start}
+
+def pending_pages(root_dir):
+    """Subdirectories of root_dir with an index.md to convert"""
+    return sorted(subdir for subdir in os.listdir(root_dir)
+                  if subdir != 'backup' and os.path.isfile(os.path.join(root_dir, subdir, 'index.md')))
+
+def build_config():
+    """The inputs shared by every page; a change to any of them rebuilds all pages"""
+    return {
+        'template': hashlib.sha256(HTML_TEMPLATE.encode('utf-8')).hexdigest(),
+        'extensions': MARKDOWN_EXTENSIONS,
+    }
+
+def page_sources(root_dir):
+    """{subdir: index.md path} of every page, preferring <subdir>/index.md over its backup copy"""
+    sources = {}
+    backup_dir = os.path.join(root_dir, 'backup')
+    if os.path.isdir(backup_dir):
+        for subdir in os.listdir(backup_dir):
+            md_file = os.path.join(backup_dir, subdir, 'index.md')
+            if os.path.isdir(os.path.join(root_dir, subdir)) and os.path.isfile(md_file):
+                sources[subdir] = md_file
+    for subdir in pending_pages(root_dir):
+        sources[subdir] = os.path.join(root_dir, subdir, 'index.md')
+    return sources
+
+def stale_pages(root_dir, sources, manifest, force=False):
+    """[(subdir, md_file, manifest entry)] of the pages whose recorded inputs differ from the current ones"""
+    config = build_config()
+    stale = []
+    for subdir, md_file in sorted(sources.items()):
+        with open(md_file, 'rb') as f:
+            entry = dict(config, source=hashlib.sha256(f.read()).hexdigest())
+        if force or manifest.get(subdir) != entry or not os.path.exists(os.path.join(root_dir, subdir, 'index.html')):
+            stale.append((subdir, md_file, entry))
+    return stale
+
+def _run_pages(tasks, jobs):
+    """Run (subdir, callable, args) tasks, in-process or in a pool; returns sorted (results, errors)"""
+    results, errors = [], []
+    if jobs <= 1:
+        for subdir, function, arguments in tasks:
+            try:
+                results.append(function(*arguments))
+            except Exception as e:
+                errors.append((subdir, f'{type(e).__name__}: {e}'))
+        return results, errors
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(function, *arguments): subdir for subdir, function, arguments in tasks}
+        for future in as_completed(futures):
             try:
-                shutil.move(md_file, backup_md_file)
-                print(f'Moved {md_file} to {backup_md_file}')
+                results.append(future.result())
             except Exception as e:
-                print(f'Failed to move {md_file} to {backup_md_file}: {e}')
+                errors.append((futures[future], f'{type(e).__name__}: {e}'))
+    results.sort(key=lambda result: result['subdir'])
+    errors.sort()
+    return results, errors
+
+def convert_all(root_dir, jobs=1):
+    """Convert every pending page; returns (results, errors) with errors as (subdir, message)"""
+    os.makedirs(os.path.join(root_dir, 'backup'), exist_ok=True)
+    return _run_pages([(subdir, convert_page, (root_dir, subdir)) for subdir in pending_pages(root_dir)], jobs)
+
+def build_incremental(root_dir, jobs=1, force=False):
+    """Rebuild the pages whose inputs changed, keeping their sources; returns (results, errors, unchanged)"""
+    manifest_file = os.path.join(root_dir, '.build-manifest.json')
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    sources = page_sources(root_dir)
+    stale = stale_pages(root_dir, sources, manifest, force)
+    unchanged = len(sources) - len(stale)
+    if not stale:
+        return [], [], unchanged
+
+    results, errors = _run_pages([(subdir, convert_page, (root_dir, subdir, md_file))
+                                  for subdir, md_file, _ in stale], jobs)
+    # Failed pages keep their old entry, so the next run retries them
+    entries = {subdir: entry for subdir, _, entry in stale}
+    for result in results:
+        manifest[result['subdir']] = entries[result['subdir']]
+    atomic_write(manifest_file, json.dumps(manifest, indent=2, sort_keys=True))
+    return results, errors, unchanged
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the technical writeups from Markdown to HTML")
+    parser.add_argument('--root', default='technical-writeups', help="writeups directory")
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes (default: 1, no pool)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="keep sources in place and rebuild only pages whose inputs changed")
+    parser.add_argument('--force', action='store_true', help="with --incremental, rebuild every page")
+    args = parser.parse_args()
+    if args.force and not args.incremental:
+        parser.error("--force only applies with --incremental")
+
+    start = time.perf_counter()
+    if args.incremental:
+        results, errors, unchanged = build_incremental(args.root, args.jobs, args.force)
+    else:
+        results, errors = convert_all(args.root, args.jobs)
+    elapsed = time.perf_counter() - start
+
+    if args.incremental and not results and not errors:
+        print(f'{unchanged} pages up to date in {elapsed * 1000:.1f} ms')
+        return
+
+    for result in results:
+        for message in result['messages']:
+            print(message)
+    for subdir, message in errors:
+        print(f'Failed to convert {os.path.join(args.root, subdir)}: {message}')
+    page_seconds = sum(result['seconds'] for result in results)
+    print(f'{len(results)} pages converted, {len(errors)} failed in {elapsed:.2f}s '
+          f'({page_seconds:.2f}s of page work, {args.jobs} job{"s" if args.jobs != 1 else ""})')
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
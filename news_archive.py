@@ -0,0 +1,166 @@
+"""
+Roll old reports in news/ into monthly compressed archives.
+
+Usage:
+    python news_archive.py compact                  # archive reports older than 30 days
+    python news_archive.py compact --keep-days 60
+    python news_archive.py extract tech_news_20250908_092253.html --output /tmp
+
+news/archive/<YYYY-MM>.gz holds a month's archived reports (category,
+combined and custom ones), each compressed as its own gzip member and
+appended in turn. The file as a whole is still a plain gzip stream, and
+every report can be cut out and inflated on its own. news/archive/
+index.json maps each report to [archive, offset, length, original size].
+
+news/archive/view.html serves an archived report in the browser: it
+fetches the report's byte range, inflates it with DecompressionStream
+and renders it. For a report that is not archived it redirects to the
+report itself, so links through the viewer always work.
+
+Compaction only ever appends to the month archives. It then removes the
+archived reports with their .gz/.br copies and points their links on
+the news page and in news/months/ at the viewer.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from news_harvester import atomic_write, read_report, report_time
+from news_index import ARCHIVE_DIR, NewsIndex
+
+NEWS_DIR = 'news'
+KEEP_DAYS = 30
+INDEX_VERSION = 1
+
+class ReportArchive:
+    """The month archives in news/archive/ and their index"""
+
+    def __init__(self, news_dir: str = NEWS_DIR):
+        self.news_dir = news_dir
+        self.archive_dir = os.path.join(news_dir, ARCHIVE_DIR)
+        self.index_file = os.path.join(self.archive_dir, 'index.json')
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        self.reports = index.get('reports', {}) if index.get('version') == INDEX_VERSION else {}
+
+    def expired_reports(self, keep_days: float = KEEP_DAYS) -> list:
+        """Reports in news_dir written more than keep_days ago, oldest first"""
+        cutoff = datetime.now() - timedelta(days=keep_days)
+        reports = [entry.path for entry in os.scandir(self.news_dir)
+                   if report_time(entry.name) and report_time(entry.name) < cutoff]
+        return sorted(reports, key=report_time)
+
+    def add(self, paths: list) -> int:
+        """Append reports to their month archives and delete them; returns the bytes saved"""
+        by_month = {}
+        for path in paths:
+            by_month.setdefault(report_time(path).strftime('%Y-%m'), []).append(path)
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        saved = 0
+        for month, month_paths in by_month.items():
+            archive = f"{month}.gz"
+            with open(os.path.join(self.archive_dir, archive), 'ab') as f:
+                for path in month_paths:
+                    with open(path, 'rb') as report:
+                        content = report.read()
+                    # mtime=0 keeps the member bytes a function of the report alone
+                    member = gzip.compress(content, compresslevel=9, mtime=0)
+                    self.reports[os.path.basename(path)] = [archive, f.tell(), len(member), len(content)]
+                    f.write(member)
+                    saved += len(content) - len(member)
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Only delete the reports once the index that finds them again is on disk
+        self.save()
+        for path in paths:
+            for copy in (path, f"{path}.gz", f"{path}.br"):
+                if os.path.exists(copy):
+                    os.remove(copy)
+        return saved
+
+    def read(self, name: str) -> bytes:
+        """The original bytes of an archived report"""
+        if name not in self.reports:
+            raise KeyError(f"{name} is not archived")
+        archive, offset, length = self.reports[name][:3]
+        with open(os.path.join(self.archive_dir, archive), 'rb') as f:
+            f.seek(offset)
+            return gzip.decompress(f.read(length))
+
+    def save(self):
+        atomic_write(self.index_file, json.dumps({'version': INDEX_VERSION, 'reports': self.reports},
+                                                 separators=(',', ':'), sort_keys=True))
+
+def saved_reports(news_dir: str = NEWS_DIR) -> dict:
+    """{name: size} of every saved report, still in news_dir or archived"""
+    reports = {name: entry[3] for name, entry in ReportArchive(news_dir).reports.items()}
+    for entry in os.scandir(news_dir):
+        if report_time(entry.name):
+            reports[entry.name] = entry.stat().st_size
+    return reports
+
+def load_report(news_dir: str, name: str, parser: str = None) -> list:
+    """Articles of a saved report, read from news_dir or from its month archive"""
+    path = os.path.join(news_dir, name)
+    if os.path.exists(path):
+        return read_report(path, parser)
+    # The path still names the report's place in news_dir, so shard links resolve
+    return read_report(path, parser, content=ReportArchive(news_dir).read(name))
+
+def compact(news_dir: str = NEWS_DIR, keep_days: float = KEEP_DAYS):
+    archive = ReportArchive(news_dir)
+    expired = archive.expired_reports(keep_days)
+    if not expired:
+        print(f"ℹ️  No reports older than {keep_days:g} days")
+        return
+
+    start = time.perf_counter()
+    saved = archive.add(expired)
+    index = NewsIndex(news_dir)
+    index.relink([os.path.basename(path) for path in expired])
+    index.save()
+    elapsed = time.perf_counter() - start
+
+    months = {report_time(path).strftime('%Y-%m') for path in expired}
+    print(f"🗜️  Archived {len(expired)} reports into {len(months)} month archives in {elapsed:.1f}s, "
+          f"saving {saved / 1024 / 1024:.1f} MB; {len(archive.reports)} reports archived in total")
+
+def extract(news_dir: str, names: list, output_dir: str):
+    archive = ReportArchive(news_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    for name in names:
+        name = os.path.basename(name)
+        try:
+            content = archive.read(name)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            sys.exit(1)
+        with open(os.path.join(output_dir, name), 'wb') as f:
+            f.write(content)
+        print(f"📄 Extracted {name} ({len(content) / 1024:.0f} KB)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old news reports into monthly compressed files")
+    parser.add_argument('command', choices=['compact', 'extract'])
+    parser.add_argument('reports', nargs='*', help="report file names to extract")
+    parser.add_argument('--news-dir', default=NEWS_DIR)
+    parser.add_argument('--keep-days', type=float, default=KEEP_DAYS, help="age after which reports are archived")
+    parser.add_argument('--output', default='.', help="directory to extract reports into")
+    args = parser.parse_args()
+
+    if args.command == 'compact':
+        compact(args.news_dir, args.keep_days)
+    else:
+        extract(args.news_dir, args.reports, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Import the archived reports in news/ into the article store.
+
+Usage:
+    python news_backfill.py             # import reports not imported yet
+    python news_backfill.py --jobs 4    # parse with 4 worker processes
+    python news_backfill.py --all       # import every report again
+
+Reports are parsed in a process pool and written to the store oldest
+first, each sighting dated by its report, so every article keeps the
+earliest report that carried it as its first sighting. Articles carried
+by several reports (a category report and the combined one, or the same
+story on consecutive days) are stored once per normalized URL. Imported
+reports are recorded by name and size in cache/backfill.json, so a later
+run only parses new or rewritten reports.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from news_archive import load_report, saved_reports
+from news_harvester import ArticleStore, SeenArticleIndex, _merge_json_file, normalize_article_url, report_time
+
+NEWS_DIR = 'news'
+STATE_DIR = 'cache'
+
+def backfill(news_dir: str = NEWS_DIR, state_dir: str = STATE_DIR, jobs: int = None,
+             import_all: bool = False) -> dict:
+    """Import the reports not imported yet; returns counts for the summary"""
+    state_file = os.path.join(state_dir, 'backfill.json')
+    imported = {}
+    if not import_all:
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                imported = json.load(f)
+        except (OSError, ValueError):
+            pass
+    # Reports rolled into news/archive/ by news_archive.py count too, with their original size
+    reports = saved_reports(news_dir)
+    pending = sorted((name for name, size in reports.items() if imported.get(name) != size), key=report_time)
+
+    store = ArticleStore(os.path.join(state_dir, 'articles.sqlite'))
+    seen = SeenArticleIndex(os.path.join(state_dir, 'seen.sqlite'))
+    stats = {'reports': len(pending), 'articles': 0, 'unique': 0, 'stored': 0}
+    urls = set()
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # map yields in submission order, so reports reach the store oldest first
+        for name, articles in zip(pending, pool.map(partial(load_report, news_dir), pending, chunksize=4)):
+            written = report_time(name).timestamp()
+            results = {name: articles}
+            stats['stored'] += store.add(results, seen_at=written)
+            seen.mark(results, seen_at=written)
+            stats['articles'] += len(articles)
+            urls.update(normalize_article_url(article.url) for article in articles)
+            # Recorded per report, so an interrupted import resumes where it stopped
+            _merge_json_file(state_file, {name: reports[name]})
+
+    stats['unique'] = len(urls)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the archived news reports into the article store")
+    parser.add_argument('news_dir', nargs='?', default=NEWS_DIR)
+    parser.add_argument('--state-dir', default=STATE_DIR, help="directory of the article store")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--all', action='store_true', help="import every report, not only new ones")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = backfill(args.news_dir, args.state_dir, args.jobs, args.all)
+    elapsed = time.perf_counter() - start
+
+    print(f"📥 Imported {stats['reports']} reports in {elapsed:.1f}s: {stats['articles']} articles, "
+          f"{stats['unique']} unique, {stats['stored']} new in the store")
+
+if __name__ == "__main__":
+    main()
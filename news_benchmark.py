@@ -0,0 +1,349 @@
+"""
+Benchmarks for the news harvester.
+
+Usage:
+    python news_benchmark.py parsers --save      # download current homepages into bench_pages/
+    python news_benchmark.py parsers             # time each parser backend on the saved pages
+    python news_benchmark.py extraction          # single-pass vs per-selector extraction, checked for equal output
+    python news_benchmark.py dedup --count 20000 # near-duplicate clustering on synthetic variants of archived titles
+    python news_benchmark.py articles            # memory and time to load a year of history (--count articles)
+    python news_benchmark.py render --count 5000 # report rendering time for a page of --count articles
+"""
+import argparse
+import glob
+import html
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+from news_harvester import (Article, NDJSONWriter, StoryDeduplicator, TechNewsScraper,
+                            available_parser_backends, read_ndjson)
+
+PAGES_DIR = 'bench_pages'
+FIXTURES_DIR = os.path.join('tests', 'fixtures')
+SITE_TYPES = ['tech', 'security', 'robotics', 'linux']
+
+def save_homepages(pages_dir: str = PAGES_DIR):
+    """Download every configured homepage so benchmarks run offline and repeatably"""
+    os.makedirs(pages_dir, exist_ok=True)
+    scraper = TechNewsScraper(delay=1.0)
+
+    for site_type in SITE_TYPES:
+        for site in scraper.get_sites(site_type):
+            domain = urlparse(site).netloc.replace('www.', '')
+            try:
+                response = scraper._fetch(site)
+                response.raise_for_status()
+            except Exception as e:
+                print(f"  skipped {domain}: {e}")
+                continue
+
+            with open(os.path.join(pages_dir, f"{domain}.html"), 'wb') as f:
+                f.write(response.content)
+            print(f"  saved {domain} ({len(response.content) // 1024} KB)")
+
+def load_pages(pages_dir: str = PAGES_DIR):
+    """
+    Return [(domain, bytes)] for the saved homepages, falling back to the
+    reports still in news/ and then to the committed test fixtures
+    """
+    paths = sorted(glob.glob(os.path.join(pages_dir, '*.html')))
+    if not paths:
+        paths = sorted(glob.glob(os.path.join('news', '*_news_*.html')))[:20]
+        source = "news/*.html reports" if paths else f"the fixtures in {FIXTURES_DIR}/"
+        print(f"No saved pages in {pages_dir}/ (run with --save); using {source} instead")
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append((os.path.basename(path)[:-len('.html')], f.read()))
+    return pages
+
+def bench_parsers(pages, repeat: int = 3):
+    """Time parse and extraction per backend and check the backends agree on the articles"""
+    backends = available_parser_backends()
+    print(f"Backends: {', '.join(backends)}  |  pages: {len(pages)}  |  repeat: {repeat}\n")
+
+    totals = {backend: [0.0, 0.0] for backend in backends}
+    results = {backend: {} for backend in backends}
+
+    for backend in backends:
+        scraper = TechNewsScraper(parser=backend)
+        for domain, content in pages:
+            site_url = f"https://{domain}"
+            for _ in range(repeat):
+                start = time.perf_counter()
+                soup = scraper.parse_html(content)
+                parsed = time.perf_counter()
+                articles = scraper.extract_articles(soup, site_url, domain, 5)
+                done = time.perf_counter()
+                totals[backend][0] += (parsed - start) / repeat
+                totals[backend][1] += (done - parsed) / repeat
+            results[backend][domain] = [(a.title, a.url) for a in articles]
+
+    print(f"{'Backend':<14} {'Parse':>10} {'Extract':>10} {'Total':>10}")
+    for backend, (parse_time, extract_time) in totals.items():
+        print(f"{backend:<14} {parse_time:>9.3f}s {extract_time:>9.3f}s {parse_time + extract_time:>9.3f}s")
+
+    # Different tree builders repair broken markup differently, so report
+    # disagreements instead of treating them as failures
+    reference = backends[-1]
+    for backend in backends[:-1]:
+        differing = [domain for domain, _ in pages if results[backend][domain] != results[reference][domain]]
+        print(f"\n{backend} vs {reference}: {len(pages) - len(differing)}/{len(pages)} pages give identical articles")
+        for domain in differing:
+            print(f"  differs: {domain}")
+
+def bench_extraction(pages, repeat: int = 3):
+    """
+    Compare single-pass extraction against one soupsieve pass per selector.
+    Both must produce identical articles for every page and article limit.
+    """
+    single_pass = TechNewsScraper(single_pass=True)
+    per_selector = TechNewsScraper(single_pass=False)
+    timings = {'per-selector': 0.0, 'single-pass': 0.0}
+    mismatches = []
+
+    for domain, content in pages:
+        soup = single_pass.parse_html(content)
+        site_url = f"https://{domain}"
+
+        for max_articles in (3, 5, 10):
+            outputs = {}
+            for name, scraper in (('per-selector', per_selector), ('single-pass', single_pass)):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    articles = scraper.extract_articles(soup, site_url, domain, max_articles)
+                timings[name] += (time.perf_counter() - start) / repeat
+                outputs[name] = [(a.title, a.url, a.summary, a.author) for a in articles]
+
+            if outputs['per-selector'] != outputs['single-pass']:
+                mismatches.append((domain, max_articles))
+
+    if not pages:
+        print("No pages to compare")
+        return
+
+    print(f"Pages: {len(pages)}  |  limits: 3, 5, 10  |  repeat: {repeat}\n")
+    for name, elapsed in timings.items():
+        print(f"{name:<14} {elapsed:>9.3f}s")
+    if timings['single-pass'] > 0:
+        print(f"speedup        {timings['per-selector'] / timings['single-pass']:>9.1f}x")
+
+    if mismatches:
+        print(f"\n❌ {len(mismatches)} page/limit combinations differ:")
+        for domain, max_articles in mismatches:
+            print(f"  {domain} (max_articles={max_articles})")
+        sys.exit(1)
+    print("\n✅ Identical articles on every page")
+
+def load_archived_titles():
+    """Unique (title, summary) pairs from the archived reports in news/"""
+    card_re = re.compile(r'<h3 class="article-title">\s*<a[^>]*>\s*(.*?)\s*</a>.*?'
+                         r'<div class="article-summary">(.*?)</div>', re.DOTALL)
+    seen = {}
+    for path in glob.glob(os.path.join('news', '*_news_*.html')):
+        with open(path, 'r', encoding='utf-8') as f:
+            for title, summary in card_re.findall(f.read()):
+                seen.setdefault(html.unescape(title), html.unescape(summary))
+    return list(seen.items())
+
+def _variant(title: str, rng: random.Random) -> str:
+    """Rewrite a headline the way another outlet might: drop, add or swap a word"""
+    words = title.split()
+    choice = rng.random()
+    if choice < 0.4 and len(words) > 4:
+        del words[rng.randrange(len(words))]
+    elif choice < 0.7:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(['report:', 'update:', 'now', 'officially']))
+    elif len(words) > 2:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    return ' '.join(words)
+
+def bench_dedup(count: int = 10000, brute_force_sample: int = 2000):
+    """Time LSH clustering at `count` articles and measure recall against brute force"""
+    rng = random.Random(42)
+    titles = load_archived_titles()
+    if not titles:
+        print("No archived reports found in news/")
+        return
+
+    # Real titles padded with headlines spliced from two random real ones,
+    # then ~20% rewritten variants of those originals
+    articles = []
+    for i in range(int(count * 0.8)):
+        if i < len(titles):
+            title, summary = titles[i]
+        else:
+            first, second = rng.choice(titles)[0].split(), rng.choice(titles)[0].split()
+            title, summary = ' '.join(first[:len(first) // 2] + second[len(second) // 2:]), ""
+        articles.append(Article(title, f"https://site{i % 50}.com/story/{i}", summary, "", f"site{i % 50}.com"))
+    while len(articles) < count:
+        original = rng.choice(articles[:int(count * 0.8)])
+        articles.append(Article(_variant(original.title, rng), f"{original.url}-copy{len(articles)}",
+                                original.summary, "", "mirror.com"))
+
+    deduplicator = StoryDeduplicator()
+    start = time.perf_counter()
+    clusters = deduplicator.clusters(articles)
+    elapsed = time.perf_counter() - start
+    print(f"Articles: {len(articles)}  |  real titles: {len(titles)}")
+    print(f"LSH clustering   {elapsed:>8.3f}s  ->  {len(clusters)} clusters "
+          f"({len(articles) - len(clusters)} folded)")
+
+    # Brute force over a sample: which pairs above the threshold did banding miss?
+    sample = articles[:brute_force_sample // 2] + articles[-brute_force_sample // 2:]
+    token_sets = [(deduplicator.tokens(article), deduplicator.summary_tokens(article)) for article in sample]
+    start = time.perf_counter()
+    similar_pairs = [(i, j) for i in range(len(sample)) for j in range(i + 1, len(sample))
+                     if deduplicator.same_story(token_sets[i], token_sets[j])]
+    brute_elapsed = time.perf_counter() - start
+
+    cluster_of = {}
+    for number, cluster in enumerate(deduplicator.clusters(sample)):
+        for index in cluster:
+            cluster_of[index] = number
+    found = sum(cluster_of[i] == cluster_of[j] for i, j in similar_pairs)
+    recall = found / len(similar_pairs) if similar_pairs else 1.0
+    projected = brute_elapsed * (len(articles) / len(sample)) ** 2
+    print(f"Brute force      {brute_elapsed:>8.3f}s on {len(sample)} articles "
+          f"(~{projected:.0f}s projected at {len(articles)})")
+    print(f"Recall vs brute force: {recall:.1%} of {len(similar_pairs)} same-story pairs")
+
+@dataclass
+class PlainArticle:
+    """The previous Article layout, kept as the baseline for bench_articles"""
+    title: str
+    url: str
+    summary: str
+    published_date: str
+    source: str
+    author: Optional[str] = None
+    is_new: bool = False
+    alternates: List[Tuple[str, str]] = field(default_factory=list)
+
+def _load_plain(path: str):
+    results = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            site = record.pop('site')
+            if record.pop('done', False):
+                continue
+            record.pop('category', None)
+            results.setdefault(site, []).append(PlainArticle(**record))
+    return results
+
+def bench_articles(count: int = 100000):
+    """Load `count` archived-style articles from NDJSON as plain dataclasses and as Article"""
+    rng = random.Random(7)
+    titles = load_archived_titles() or [("Example headline about a kernel release", "A short summary.")]
+    start_date = datetime(2025, 1, 1)
+    sites = {}
+    for i in range(count):
+        title, summary = titles[i % len(titles)]
+        site = f"site{i % 60}.com"
+        sites.setdefault(site, []).append(Article(
+            title, f"https://{site}/story/{i}", summary,
+            start_date + timedelta(minutes=rng.randrange(365 * 24 * 60)), site, category=SITE_TYPES[i % 4]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.ndjson')
+        with NDJSONWriter(path) as writer:
+            for site, articles in sites.items():
+                writer.write_site(site, articles)
+        del sites
+        print(f"Articles: {count}  |  NDJSON: {os.path.getsize(path) // 1024} KB\n")
+
+        # Report cards show every date, so formatting them is part of the cost
+        display_dates = {
+            'dataclass': lambda a: datetime.strptime(a.published_date, '%Y-%m-%d %H:%M:%S').strftime('%b %d, %Y at %H:%M'),
+            'Article': lambda a: a.published.strftime('%b %d, %Y at %H:%M'),
+        }
+        print(f"{'Layout':<12} {'Load':>9} {'Dates':>9} {'Memory':>10} {'Per article':>12}")
+        for name, loader in (('dataclass', _load_plain), ('Article', read_ndjson)):
+            start = time.perf_counter()
+            loaded = loader(path)
+            loaded_at = time.perf_counter()
+            for articles in loaded.values():
+                for article in articles:
+                    display_dates[name](article)
+            formatted_at = time.perf_counter()
+            del loaded
+
+            tracemalloc.start()
+            loaded = loader(path)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del loaded
+            print(f"{name:<12} {loaded_at - start:>8.2f}s {formatted_at - loaded_at:>8.2f}s "
+                  f"{memory / 2**20:>8.1f}MB {memory / count:>10.0f} B")
+
+def bench_render(count: int = 5000, repeat: int = 3):
+    """Time save_to_html on `count` articles spread over the configured sites"""
+    titles = load_archived_titles() or [("Example headline & <markup> to escape", "A short summary.")]
+    scraper = TechNewsScraper()
+    sites = [urlparse(site).netloc.replace('www.', '') for site in scraper.get_sites('tech')]
+    articles_dict = {}
+    for i in range(count):
+        title, summary = titles[i % len(titles)]
+        site = sites[i % len(sites)]
+        articles_dict.setdefault(site, []).append(Article(
+            title, f"https://{site}/story/{i}?ref=home&id={i}", summary,
+            datetime(2025, 9, 1) + timedelta(hours=i), site, author="Staff" if i % 3 else None))
+
+    start = time.perf_counter()
+    scraper.compiled_html_template()
+    compile_time = time.perf_counter() - start
+
+    # save_to_html always writes below html/
+    start = time.perf_counter()
+    for _ in range(repeat):
+        filename = scraper.save_to_html(articles_dict, filename='benchmark_report.html', site_type='tech')
+    elapsed = (time.perf_counter() - start) / repeat
+    size = os.path.getsize(filename)
+    os.remove(filename)
+
+    print(f"Articles: {count}  |  sites: {len(articles_dict)}  |  repeat: {repeat}\n")
+    print(f"template compile  {compile_time * 1000:>8.2f} ms (then cached until the file changes)")
+    print(f"save_to_html      {elapsed * 1000:>8.1f} ms  ({elapsed / count * 1e6:.1f} us per card, {size // 1024} KB)")
+
+def main():
+    parser = argparse.ArgumentParser(description="News harvester benchmarks")
+    parser.add_argument('benchmark', choices=['parsers', 'extraction', 'dedup', 'articles', 'render'])
+    parser.add_argument('--pages', default=PAGES_DIR, help="directory of saved homepages")
+    parser.add_argument('--save', action='store_true', help="download current homepages first")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--count', type=int, help="articles to generate (dedup: 10000, articles: 100000, render: 5000)")
+    args = parser.parse_args()
+
+    if args.save:
+        save_homepages(args.pages)
+    # Without --count each benchmark uses its own default size
+    count = {'count': args.count} if args.count is not None else {}
+
+    if args.benchmark == 'parsers':
+        bench_parsers(load_pages(args.pages), args.repeat)
+    elif args.benchmark == 'extraction':
+        bench_extraction(load_pages(args.pages), args.repeat)
+    elif args.benchmark == 'dedup':
+        bench_dedup(**count)
+    elif args.benchmark == 'articles':
+        bench_articles(**count)
+    elif args.benchmark == 'render':
+        bench_render(repeat=args.repeat, **count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Compact saved reports in place for serving.
+
+Usage:
+    python news_compact.py news/*_news_*.html
+
+Each report's inline CSS moves into a shared stylesheet named after its
+hash, the markup is minified and .gz/.br copies are written next to it
+(see compact_report in news_harvester.py).
+"""
+import argparse
+
+from news_harvester import compact_reports
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify news reports and write their compressed copies")
+    parser.add_argument('reports', nargs='+', help="report files to compact in place")
+    args = parser.parse_args()
+
+    compact_reports(args.reports)
+
+if __name__ == "__main__":
+    main()
@@ -1,90 +1,2240 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound, Tag
 import time
 import json
 import csv
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
 import logging
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Iterator, Sequence
 import re
 import os
+import sys
+import io
+import html
+import hashlib
+import sqlite3
+import contextlib
+from email.utils import parsedate_to_datetime
+from xml.etree import ElementTree
+import threading
+import random
+import gzip
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from urllib3.exceptions import NewConnectionError
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz siblings are written
+    brotli = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
-class Article:
-    title: str
-    url: str
-    summary: str
-    published_date: str
-    source: str
-    author: Optional[str] = None
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def _to_datetime(value) -> Optional[datetime]:
+    """Accept a datetime or a DATE_FORMAT / ISO 8601 string"""
+    if not value or isinstance(value, datetime):
+        return value or None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+class Article:
+    """
+    One harvested article.
+
+    Articles are held by the thousand when loading history, so the class
+    uses __slots__ instead of a per-instance dict, keeps the publication
+    time as a datetime (published) rather than a string that has to be
+    re-parsed for display, and interns source and category, which repeat
+    across most articles. published_date is the string form used by the
+    JSON and CSV layouts.
+    """
+
+    __slots__ = ('title', 'url', 'summary', 'published', 'source', 'author', 'category', 'is_new', 'alternates')
+
+    CSV_HEADER = ['Title', 'URL', 'Summary', 'Published Date', 'Source', 'Author']
+
+    def __init__(self, title: str, url: str, summary: str, published_date=None, source: str = "",
+                 author: Optional[str] = None, is_new: bool = False,
+                 alternates: Sequence[Tuple[str, str]] = (), category: Optional[str] = None):
+        self.title = title
+        self.url = url
+        self.summary = summary
+        self.published = published_date if isinstance(published_date, datetime) else _to_datetime(published_date)
+        self.source = sys.intern(source) if source else source
+        self.author = author
+        self.category = sys.intern(category) if category else category
+        self.is_new = is_new
+        # (source, url) of near-duplicate stories folded into this one; the
+        # shared empty tuple saves a list per article
+        self.alternates = alternates or ()
+
+    @property
+    def published_date(self) -> str:
+        return self.published.strftime(DATE_FORMAT) if self.published else ""
+
+    def replace(self, **changes) -> 'Article':
+        """A copy with some fields changed, like dataclasses.replace"""
+        fields = {name: getattr(self, name) for name in self.__slots__ if name != 'published'}
+        fields['published_date'] = self.published
+        fields.update(changes)
+        return Article(**fields)
+
+    def to_dict(self) -> Dict:
+        """The fields of the save_to_json layout"""
+        return {
+            'title': self.title,
+            'url': self.url,
+            'summary': self.summary,
+            'published_date': self.published_date,
+            'source': self.source,
+            'author': self.author
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, category: Optional[str] = None) -> 'Article':
+        """Inverse of to_dict; keys it does not know are ignored"""
+        return cls(data.get('title', ''), data.get('url', ''), data.get('summary', ''),
+                   data.get('published_date'), data.get('source', ''), data.get('author'),
+                   category=data.get('category', category))
+
+    def to_row(self) -> List:
+        """A save_to_csv row, in CSV_HEADER order"""
+        return [self.title, self.url, self.summary, self.published_date, self.source, self.author]
+
+    @classmethod
+    def from_row(cls, row: List[str], category: Optional[str] = None) -> 'Article':
+        title, url, summary, published_date, source, author = row
+        return cls(title, url, summary, published_date, source, author or None, category=category)
+
+    def __eq__(self, other):
+        if not isinstance(other, Article):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Article(title={self.title!r}, url={self.url!r}, source={self.source!r}, published_date={self.published_date!r})"
+
+# BeautifulSoup tree builders, fastest first. lxml is optional; html.parser
+# ships with Python and is always available as the fallback.
+PARSER_BACKENDS = ['lxml', 'html.parser']
+
+def available_parser_backends() -> List[str]:
+    """Return the installed parser backends, fastest first"""
+    available = []
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('', backend)
+        except FeatureNotFound:
+            continue
+        available.append(backend)
+    return available
+
+def select_parser_backend(preferred: Optional[str] = None) -> str:
+    """Return preferred if it is installed, otherwise the fastest installed backend"""
+    available = available_parser_backends()
+    if preferred:
+        if preferred in available:
+            return preferred
+        logger.warning(f"Parser backend {preferred} is not installed, using {available[0]}")
+    return available[0]
+
+_COMPOUND_SELECTOR_RE = re.compile(r'([a-z][a-z0-9]*)?((?:\.[\w-]+|\[[\w-]+(?:\*="[^"]*")?\])*)')
+_SELECTOR_PART_RE = re.compile(r'\.([\w-]+)|\[([\w-]+)(\*="([^"]*)")?\]')
+
+def _compile_compound_selector(compound: str):
+    """
+    Compile a compound selector made of an optional tag name, .class,
+    [attr] and [attr*="value"] parts into a predicate on (tag name, attrs).
+    Returns None for anything more complex.
+    """
+    match = _COMPOUND_SELECTOR_RE.fullmatch(compound)
+    if not match or not compound:
+        return None
+    
+    tag_name = match.group(1)
+    classes = []
+    attributes = []
+    for class_name, attr, has_value, substring in _SELECTOR_PART_RE.findall(match.group(2)):
+        if class_name:
+            classes.append(class_name)
+        else:
+            attributes.append((attr, substring if has_value else None))
+    
+    def matches(name, attrs):
+        if tag_name and name != tag_name:
+            return False
+        if classes:
+            element_classes = attrs.get('class') or ()
+            if isinstance(element_classes, str):
+                element_classes = element_classes.split()
+            for class_name in classes:
+                if class_name not in element_classes:
+                    return False
+        for attr, substring in attributes:
+            value = attrs.get(attr)
+            if value is None:
+                return False
+            if substring is not None:
+                # Multi-valued attributes match against their space-joined value, like soupsieve
+                if not isinstance(value, str):
+                    value = ' '.join(value)
+                if not substring or substring not in value:
+                    return False
+        return True
+    
+    return matches
+
+def _compile_selector(selector: str):
+    """
+    Compile "compound" or "ancestor compound" selectors into
+    (ancestor predicate or None, element predicate); None if unsupported.
+    """
+    parts = selector.split()
+    if len(parts) not in (1, 2):
+        return None
+    predicates = [_compile_compound_selector(part) for part in parts]
+    if any(predicate is None for predicate in predicates):
+        return None
+    return (predicates[0], predicates[1]) if len(parts) == 2 else (None, predicates[0])
+
+def _walk_with_selectors(roots, context: frozenset, compiled: List, on_match):
+    """
+    Walk the subtrees under roots once in document order, calling
+    on_match(index, element) for every element matching compiled[index].
+    context holds the indexes of ancestor predicates already satisfied above
+    the roots. on_match may return True to stop the walk early.
+    """
+    stack = [(root, context) for root in reversed(roots)]
+    while stack:
+        element, context = stack.pop()
+        
+        name = element.name
+        attrs = element.attrs
+        satisfied = context
+        for index, (ancestor_predicate, predicate) in enumerate(compiled):
+            if (ancestor_predicate is None or index in context) and predicate(name, attrs):
+                if on_match(index, element):
+                    return
+            if ancestor_predicate is not None and index not in satisfied and ancestor_predicate(name, attrs):
+                satisfied = satisfied | {index}
+        
+        children = [child for child in element.contents if isinstance(child, Tag)]
+        stack.extend((child, satisfied) for child in reversed(children))
+
+def _ancestor_context(element, compiled: List) -> frozenset:
+    """Indexes of the ancestor predicates satisfied by element or any of its ancestors"""
+    satisfied = set()
+    node = element
+    while node is not None and node.name != '[document]':
+        for index, (ancestor_predicate, _) in enumerate(compiled):
+            if ancestor_predicate is not None and ancestor_predicate(node.name, node.attrs):
+                satisfied.add(index)
+        node = node.parent
+    return frozenset(satisfied)
+
+class CandidateIndex:
+    """
+    One walk over a parsed page that buckets every element by each of the
+    given selectors, in document order. select() and find_all('a', href=True)
+    answer from the buckets, so the strategies can take it in place of the
+    soup; unsupported selectors fall back to soupsieve.
+    """
+
+    def __init__(self, soup, selectors: List[str]):
+        self.soup = soup
+        self.buckets = {}
+        
+        supported = []
+        compiled = []
+        for selector in dict.fromkeys(selectors + ['a[href]']):
+            compiled_selector = _compile_selector(selector)
+            if compiled_selector:
+                supported.append(selector)
+                compiled.append(compiled_selector)
+                self.buckets[selector] = []
+        
+        def collect(index, element):
+            self.buckets[supported[index]].append(element)
+        
+        roots = [child for child in soup.contents if isinstance(child, Tag)]
+        _walk_with_selectors(roots, frozenset(), compiled, collect)
+
+    def select(self, selector: str):
+        if selector in self.buckets:
+            return self.buckets[selector]
+        return self.soup.select(selector)
+
+    def find_all(self, name=None, href=None, **kwargs):
+        if name == 'a' and href is True and not kwargs:
+            return self.buckets['a[href]']
+        if href is not None:
+            kwargs['href'] = href
+        return self.soup.find_all(name, **kwargs)
+
+class ContainerSelectors:
+    """Finds the first match of each selector inside a container with one subtree walk"""
+
+    def __init__(self, selectors: List[str]):
+        self.selectors = list(dict.fromkeys(selectors))
+        self.compiled = [_compile_selector(selector) for selector in self.selectors]
+        if any(compiled is None for compiled in self.compiled):
+            raise ValueError(f"Unsupported selector in {selectors}")
+
+    def first_matches(self, element) -> Dict[str, object]:
+        """Map each selector to its first match among element's descendants (like select_one)"""
+        first = {}
+        
+        def keep_first(index, match):
+            selector = self.selectors[index]
+            if selector not in first:
+                first[selector] = match
+                return len(first) == len(self.selectors)
+        
+        children = [child for child in element.contents if isinstance(child, Tag)]
+        _walk_with_selectors(children, _ancestor_context(element, self.compiled), self.compiled, keep_first)
+        return first
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/rdf+xml')
+
+def discover_feed_url(soup, page_url: str) -> Optional[str]:
+    """Return the first RSS/Atom feed advertised with <link rel="alternate"> on a page"""
+    for link in soup.find_all('link', href=True):
+        rel = link.get('rel') or []
+        if isinstance(rel, str):
+            rel = rel.split()
+        if 'alternate' in rel and (link.get('type') or '').lower() in FEED_TYPES:
+            # Skip comment feeds, they are not the site's news stream
+            if 'comments' in link['href'].lower():
+                continue
+            return urljoin(page_url, link['href'])
+    return None
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1].lower()
+
+def _strip_markup(text: str) -> str:
+    text = html.unescape(re.sub(r'<[^>]+>', ' ', text or ''))
+    return re.sub(r'\s+', ' ', text).strip()
+
+def _parse_feed_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an RFC 822 (RSS) or ISO 8601 (Atom, sitemap) date into a naive local datetime"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.replace(microsecond=0)
+
+def parse_feed(content: bytes, domain: str, max_articles: int) -> List[Article]:
+    """
+    Stream-parse an RSS 2.0, RSS 1.0, Atom or Google News sitemap document
+    into Articles, stopping once max_articles have been read.
+    """
+    articles = []
+    fields = {}
+    open_elements = []
+    
+    for event, element in ElementTree.iterparse(io.BytesIO(content), events=('start', 'end')):
+        name = _local_name(element.tag)
+        
+        if event == 'start':
+            open_elements.append(name)
+            if name in ('item', 'entry', 'url'):
+                fields = {}
+            continue
+        
+        open_elements.pop()
+        parent = open_elements[-1] if open_elements else None
+        text = (element.text or '').strip()
+        if name == 'link':
+            # Atom puts the URL in href, RSS in the element text
+            rel = element.get('rel', 'alternate')
+            if element.get('href') and rel == 'alternate':
+                fields.setdefault('url', element.get('href'))
+            elif text:
+                fields.setdefault('url', text)
+        elif name == 'loc':
+            fields.setdefault('url', text)
+        elif name == 'title':
+            fields.setdefault('title', text)
+        elif name in ('description', 'summary', 'content', 'encoded'):
+            fields.setdefault('summary', text)
+        elif name in ('pubdate', 'published', 'updated', 'date', 'publication_date'):
+            fields.setdefault('date', text)
+        elif (name in ('creator', 'author') or (name == 'name' and parent == 'author')) and text:
+            fields.setdefault('author', text)
+        elif name in ('item', 'entry', 'url'):
+            if fields.get('title') and fields.get('url'):
+                summary = _strip_markup(fields.get('summary', ''))
+                articles.append(Article(
+                    title=_strip_markup(fields['title']),
+                    url=fields['url'],
+                    summary=summary[:200] + "..." if len(summary) > 200 else summary,
+                    published_date=_parse_feed_date(fields.get('date')) or datetime.now().replace(microsecond=0),
+                    source=domain,
+                    author=fields.get('author')
+                ))
+                if len(articles) >= max_articles:
+                    break
+            fields = {}
+            element.clear()
+    
+    return articles
+
+def _host_unreachable(error: requests.RequestException) -> bool:
+    """Whether a request failed to resolve the host or had its connection refused"""
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+def _feed_gone(error: Exception) -> bool:
+    """Whether a feed request failed because the feed no longer exists, not transiently"""
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in (404, 410)
+
+class FeedDirectory:
+    """
+    Remembers, per site, the feed or news sitemap to read instead of the
+    homepage, and which sites were found to have none. Sites without a feed
+    are re-checked after recheck_days.
+    """
+
+    def __init__(self, feeds_file: Optional[str] = "cache/feeds.json", recheck_days: float = 7.0):
+        self.feeds_file = feeds_file
+        self.recheck = recheck_days * 86400
+        self._lock = threading.Lock()
+        self.sites = {}
+        if feeds_file:
+            try:
+                with open(feeds_file, 'r', encoding='utf-8') as f:
+                    self.sites = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    def feed_url(self, site_url: str) -> Optional[str]:
+        with self._lock:
+            entry = self.sites.get(site_url)
+        return entry.get('feed_url') if entry else None
+
+    def needs_discovery(self, site_url: str) -> bool:
+        with self._lock:
+            entry = self.sites.get(site_url)
+        return not entry or (not entry.get('feed_url') and time.time() - entry['checked_at'] > self.recheck)
+
+    def remember(self, site_url: str, feed_url: Optional[str]):
+        entry = {'feed_url': feed_url, 'checked_at': time.time()}
+        with self._lock:
+            self.sites[site_url] = entry
+        if self.feeds_file:
+            _merge_json_file(self.feeds_file, {site_url: entry})
+
+# Query keys matched exactly, and prefixes of whole families of tracking keys
+TRACKING_PARAMS = frozenset(('fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'cmpid', 'ncid'))
+TRACKING_PREFIXES = ('utm_',)
+
+def normalize_article_url(url: str) -> str:
+    """
+    Canonical form of an article URL for de-duplication: lower-case host
+    without www., no fragment, no tracking parameters, sorted query and no
+    trailing slash.
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse(('https' if parsed.scheme in ('http', 'https') else parsed.scheme,
+                       host, path, '', urlencode(query), ''))
+
+@contextlib.contextmanager
+def _sqlite_connection(db_file: str):
+    """
+    A short-lived connection to db_file, committed when the block succeeds,
+    rolled back when it raises and closed either way. One connection per
+    call keeps the databases usable from any worker thread.
+    """
+    with contextlib.closing(sqlite3.connect(db_file, timeout=30)) as conn:
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+class SeenArticleIndex:
+    """
+    SQLite index of every article URL ever harvested, keyed on the
+    normalized URL with first-seen and last-seen timestamps. Lookups go
+    through the primary key, so they stay O(1)-ish as history grows.
+    """
+
+    # SQLite caps the number of bound parameters per statement
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, db_file: str = "cache/seen.sqlite"):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        with _sqlite_connection(self.db_file) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS seen (
+                    url TEXT PRIMARY KEY,
+                    source TEXT,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+
+    def seen_urls(self, urls: List[str]) -> set:
+        """Return which of the given normalized URLs are already in the index"""
+        found = set()
+        with _sqlite_connection(self.db_file) as conn:
+            for start in range(0, len(urls), self.LOOKUP_CHUNK):
+                chunk = urls[start:start + self.LOOKUP_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(row[0] for row in conn.execute(
+                    f"SELECT url FROM seen WHERE url IN ({placeholders})", chunk))
+        return found
+
+    def mark(self, articles_dict: Dict[str, List[Article]], seen_at: Optional[float] = None) -> int:
+        """
+        Set is_new on every article not seen in an earlier run, then record
+        all of them as seen now, or at seen_at when importing history.
+        Returns the number of new articles.
+        """
+        normalized = {}
+        for articles in articles_dict.values():
+            for article in articles:
+                normalized.setdefault(normalize_article_url(article.url), []).append(article)
+        if not normalized:
+            return 0
+        
+        already_seen = self.seen_urls(list(normalized))
+        new_count = 0
+        for url, articles in normalized.items():
+            for article in articles:
+                article.is_new = url not in already_seen
+            new_count += url not in already_seen
+        
+        now = seen_at or time.time()
+        with _sqlite_connection(self.db_file) as conn:
+            conn.executemany("""
+                INSERT INTO seen (url, source, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    source = CASE WHEN excluded.first_seen < first_seen THEN excluded.source ELSE source END,
+                    first_seen = min(first_seen, excluded.first_seen),
+                    last_seen = max(last_seen, excluded.last_seen)
+            """, [(url, articles[0].source, now, now) for url, articles in normalized.items()])
+        return new_count
+
+class ArticleStore:
+    """
+    SQLite database of every harvested article, one row per normalized URL.
+
+    Indexes on source, category and published date (and the unique URL key)
+    make filtered history queries cheap, and an FTS5 table over title and
+    summary serves full-text search. Without FTS5 in the local SQLite build,
+    text search falls back to LIKE scans.
+    """
+
+    def __init__(self, db_file: str = "cache/articles.sqlite"):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        with _sqlite_connection(self.db_file) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY,
+                    url_key TEXT NOT NULL UNIQUE,
+                    url TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    summary TEXT,
+                    published_date TEXT,
+                    source TEXT,
+                    category TEXT,
+                    author TEXT,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS articles_source ON articles (source, published_date);
+                CREATE INDEX IF NOT EXISTS articles_category ON articles (category, published_date);
+                CREATE INDEX IF NOT EXISTS articles_published ON articles (published_date);
+            """)
+            try:
+                conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts
+                        USING fts5(title, summary, content='articles', content_rowid='id');
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                        INSERT INTO articles_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                        INSERT INTO articles_fts (articles_fts, rowid, title, summary)
+                            VALUES ('delete', old.id, old.title, old.summary);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary ON articles BEGIN
+                        INSERT INTO articles_fts (articles_fts, rowid, title, summary)
+                            VALUES ('delete', old.id, old.title, old.summary);
+                        INSERT INTO articles_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+                    END;
+                """)
+                self.full_text = True
+            except sqlite3.OperationalError:
+                logger.warning("SQLite has no FTS5; article text search will scan the table")
+                self.full_text = False
+
+    def add(self, articles_dict: Dict[str, List[Article]], category: Optional[str] = None,
+            seen_at: Optional[float] = None) -> int:
+        """
+        Bulk-insert scrape results in one transaction. Articles already stored
+        keep their first harvest and only get last_seen bumped, unless the
+        new sighting is older (seen_at dates it, for imports of older
+        reports): then its fields replace the stored ones. Returns the
+        number of rows inserted.
+        """
+        now = seen_at or time.time()
+        rows = [
+            (normalize_article_url(article.url), article.url, article.title, article.summary,
+             article.published_date, article.source, category or article.category, article.author, now, now)
+            for articles in articles_dict.values() for article in articles
+        ]
+        with _sqlite_connection(self.db_file) as conn:
+            # New rows get ids above the current maximum; upserted ones keep theirs
+            last_id = conn.execute("SELECT ifnull(max(id), 0) FROM articles").fetchone()[0]
+            conn.executemany("""
+                INSERT INTO articles (url_key, url, title, summary, published_date, source,
+                                      category, author, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url_key) DO UPDATE SET
+                    url = CASE WHEN excluded.first_seen < first_seen THEN excluded.url ELSE url END,
+                    title = CASE WHEN excluded.first_seen < first_seen THEN excluded.title ELSE title END,
+                    summary = CASE WHEN excluded.first_seen < first_seen THEN excluded.summary ELSE summary END,
+                    published_date = CASE WHEN excluded.first_seen < first_seen
+                                          THEN excluded.published_date ELSE published_date END,
+                    source = CASE WHEN excluded.first_seen < first_seen THEN excluded.source ELSE source END,
+                    category = CASE WHEN excluded.first_seen < first_seen THEN excluded.category ELSE category END,
+                    author = CASE WHEN excluded.first_seen < first_seen THEN excluded.author ELSE author END,
+                    first_seen = min(first_seen, excluded.first_seen),
+                    last_seen = max(last_seen, excluded.last_seen)
+            """, rows)
+            return conn.execute("SELECT ifnull(max(id), 0) FROM articles").fetchone()[0] - last_id
+
+    def query(self, source: Optional[str] = None, category: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              text: Optional[str] = None, limit: Optional[int] = 100) -> List[Article]:
+        """
+        Stored articles, newest first. since and until compare against the
+        published date as a prefix ("2025-09", "2025-09-15"); until is
+        exclusive. text matches every word in the title or summary.
+        """
+        clauses, params = [], []
+        joins = ""
+        if source:
+            clauses.append("a.source = ?")
+            params.append(source.lower().replace('www.', ''))
+        if category:
+            clauses.append("a.category = ?")
+            params.append(category)
+        if since:
+            clauses.append("a.published_date >= ?")
+            params.append(since)
+        if until:
+            clauses.append("a.published_date < ?")
+            params.append(until)
+        if text:
+            words = text.split()
+            if self.full_text:
+                joins = "JOIN articles_fts ON articles_fts.rowid = a.id"
+                clauses.append("articles_fts MATCH ?")
+                params.append(' '.join('"' + word.replace('"', '""') + '"' for word in words))
+            else:
+                for word in words:
+                    clauses.append("(a.title LIKE ? OR a.summary LIKE ?)")
+                    params.extend([f"%{word}%"] * 2)
+
+        sql = f"""
+            SELECT a.title, a.url, a.summary, a.published_date, a.source, a.author, a.category
+            FROM articles a {joins}
+            {"WHERE " + " AND ".join(clauses) if clauses else ""}
+            ORDER BY a.published_date DESC
+        """
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with _sqlite_connection(self.db_file) as conn:
+            return [Article(title, url, summary, published_date, source, author, category=category)
+                    for title, url, summary, published_date, source, author, category in conn.execute(sql, params)]
+
+    def counts(self, by: str = "source") -> List[Tuple[str, int]]:
+        """Number of stored articles per source or per category, largest first"""
+        if by not in ("source", "category"):
+            raise ValueError(f"Cannot count by {by}; use source or category")
+        with _sqlite_connection(self.db_file) as conn:
+            return conn.execute(
+                f"SELECT {by}, count(*) FROM articles GROUP BY {by} ORDER BY count(*) DESC").fetchall()
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its new of on or says "
+    "that the this to was what when why will with".split()
+)
+
+# Mersenne prime for the MinHash hash family h(x) = (a * x + b) mod p
+_MINHASH_PRIME = (1 << 61) - 1
+_MIN_SUMMARY_WORDS = 8
+
+class StoryDeduplicator:
+    """
+    Clusters near-duplicate stories with MinHash signatures of their title
+    words and summary words and an LSH index.
+    
+    Signatures are cut into `bands` bands of `rows` hashes and only articles
+    sharing a band of either signature are compared, so the cost grows with
+    the number of colliding pairs rather than with n^2. Candidates are
+    confirmed when the exact Jaccard similarity of their title words reaches
+    `threshold`. Summaries weigh less: similar summaries (the same wire copy
+    under a reworded headline) only confirm a pair whose titles reach a third
+    of the threshold, so a site's boilerplate summary never merges unrelated
+    stories. Articles with the same normalized URL always cluster.
+    """
+
+    def __init__(self, threshold: float = 0.7, bands: int = 15, rows: int = 4):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(20250827)  # fixed seed: signatures are comparable across runs
+        self._coefficients = [(rng.randrange(1, _MINHASH_PRIME), rng.randrange(_MINHASH_PRIME))
+                              for _ in range(bands * rows)]
+        self._token_cache = {}
+
+    @staticmethod
+    def tokens(article: Article) -> frozenset:
+        """Distinct title words, without stop words"""
+        return frozenset(w for w in _WORD_RE.findall(article.title.lower()) if w not in _STOPWORDS)
+
+    @staticmethod
+    def summary_tokens(article: Article) -> frozenset:
+        """Distinct summary words, without stop words; empty for summaries too short to compare"""
+        words = frozenset(w for w in _WORD_RE.findall(article.summary.lower()) if w not in _STOPWORDS)
+        return words if len(words) >= _MIN_SUMMARY_WORDS else frozenset()
+
+    def same_story(self, tokens_a: Tuple[frozenset, frozenset], tokens_b: Tuple[frozenset, frozenset]) -> bool:
+        """Whether two (title, summary) token pairs describe the same story"""
+        title = self.similarity(tokens_a[0], tokens_b[0])
+        # Titles under three words are too short to match on their own
+        if title >= self.threshold and len(tokens_a[0]) >= 3 and len(tokens_b[0]) >= 3:
+            return True
+        return (title >= self.threshold / 3 and bool(tokens_a[1]) and bool(tokens_b[1])
+                and self.similarity(tokens_a[1], tokens_b[1]) >= self.threshold)
+
+    def _token_hashes(self, token: str) -> Tuple[int, ...]:
+        hashes = self._token_cache.get(token)
+        if hashes is None:
+            x = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+            hashes = tuple((a * x + b) % _MINHASH_PRIME for a, b in self._coefficients)
+            self._token_cache[token] = hashes
+        return hashes
+
+    def signature(self, tokens: frozenset) -> Tuple[int, ...]:
+        """MinHash signature: per hash function, the minimum over the tokens"""
+        return tuple(map(min, zip(*(self._token_hashes(token) for token in tokens))))
+
+    @staticmethod
+    def similarity(tokens_a: frozenset, tokens_b: frozenset) -> float:
+        union = len(tokens_a | tokens_b)
+        return len(tokens_a & tokens_b) / union if union else 0.0
+
+    def clusters(self, articles: List[Article]) -> List[List[int]]:
+        """Group article indexes into clusters of near-duplicates (singletons included)"""
+        parent = list(range(len(articles)))
+        
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        def union(i, j):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+        
+        by_url = {}
+        for index, article in enumerate(articles):
+            url = normalize_article_url(article.url)
+            if url in by_url:
+                union(by_url[url], index)
+            else:
+                by_url[url] = index
+        
+        token_sets = [(self.tokens(article), self.summary_tokens(article)) for article in articles]
+        buckets = {}
+        for index, (title, summary) in enumerate(token_sets):
+            for field, tokens in (('title', title if len(title) >= 3 else None), ('summary', summary or None)):
+                if tokens is None:
+                    continue
+                signature = self.signature(tokens)
+                for band in range(self.bands):
+                    key = (field, band, signature[band * self.rows:(band + 1) * self.rows])
+                    for other in buckets.setdefault(key, []):
+                        if find(other) != find(index) and self.same_story(token_sets[other], token_sets[index]):
+                            union(other, index)
+                    buckets[key].append(index)
+        
+        groups = {}
+        for index in range(len(articles)):
+            groups.setdefault(find(index), []).append(index)
+        return list(groups.values())
+
+    def dedupe(self, articles_dict: Dict[str, List[Article]]) -> Dict[str, List[Article]]:
+        """
+        Keep the first article of each cluster (in section order) and record
+        the others as its alternates; the input dict is not modified.
+        """
+        flat = [(site, article) for site, articles in articles_dict.items() for article in articles]
+        keep = {}
+        for cluster in self.clusters([article for _, article in flat]):
+            first, rest = cluster[0], cluster[1:]
+            article = flat[first][1]
+            alternates = list(article.alternates)
+            alternates += [(flat[i][1].source, flat[i][1].url) for i in rest
+                           if normalize_article_url(flat[i][1].url) != normalize_article_url(article.url)]
+            alternates += [alt for i in rest for alt in flat[i][1].alternates]
+            keep[first] = article.replace(alternates=list(dict.fromkeys(map(tuple, alternates))))
+        
+        deduped = {site: [] for site in articles_dict}
+        for index, (site, _) in enumerate(flat):
+            if index in keep:
+                deduped[site].append(keep[index])
+        
+        removed = len(flat) - len(keep)
+        if removed:
+            logger.info(f"Folded {removed} near-duplicate articles into {len(keep)} stories")
+        return deduped
+
+def _tmp_path(path: str) -> str:
+    """A temporary name next to path, unique per process and thread"""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def atomic_write(path: str, data, mode: str = 'w'):
+    """
+    Write data (str, or bytes with mode 'wb') to path through a temporary
+    file that replaces it in one rename, so readers see the old or the new
+    content and never a partial one. Concurrent writers of the same path
+    never share a temporary file.
+    """
+    tmp_path = _tmp_path(path)
+    try:
+        with open(tmp_path, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# Serializes read-modify-write of shared state files between scrapers in one process
+_state_file_lock = threading.Lock()
+
+def _merge_json_file(path: str, updates: Dict):
+    """Merge updates into the JSON object stored at path, writing atomically"""
+    with _state_file_lock:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data.update(updates)
+        
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            atomic_write(path, json.dumps(data, indent=2))
+        except OSError as e:
+            logger.warning(f"Could not save {path}: {e}")
+
+class ResponseCache:
+    """
+    On-disk cache of homepage validators and extracted articles.
+    
+    Each URL gets one JSON file holding its ETag, Last-Modified, a hash of the
+    response body and the articles extracted from it, so an unchanged page
+    costs neither the transfer (304) nor the parse (identical body hash).
+    """
+
+    def __init__(self, cache_dir: str = "cache/responses", max_age_days: float = 7.0,
+                 max_size_bytes: int = 20 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_age = max_age_days * 86400
+        self.max_size_bytes = max_size_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.evict()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for url, or None if missing, unreadable or expired"""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if time.time() - entry.get('stored_at', 0) > self.max_age:
+            return None
+        return entry
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from a cached entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, response, body_hash: str, articles: List[Article], max_articles: int):
+        """Store validators and extracted articles for url"""
+        entry = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': body_hash,
+            'max_articles': max_articles,
+            'stored_at': time.time(),
+            'articles': [article.to_dict() for article in articles]
+        }
+        self._write(url, entry)
+
+    def touch(self, url: str, entry: Dict):
+        """Refresh the age of an entry that was revalidated"""
+        entry['stored_at'] = time.time()
+        self._write(url, entry)
+
+    def _write(self, url: str, entry: Dict):
+        # Write to a temp file first so a crash never leaves a truncated entry
+        try:
+            atomic_write(self._path(url), json.dumps(entry, ensure_ascii=False))
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {url}: {e}")
+
+    @staticmethod
+    def articles_from_entry(entry: Dict) -> List[Article]:
+        return [Article.from_dict(data) for data in entry.get('articles', [])]
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until the cache fits max_size_bytes"""
+        now = time.time()
+        entries = []
+        
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            
+            if name.endswith('.tmp') or now - stat.st_mtime > self.max_age:
+                # Scrapers sharing the directory evict concurrently; the file may be gone already
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_size -= size
+
+class HostRateLimiter:
+    """
+    Token bucket per host.
+    
+    A host's refill interval starts at the larger of the default delay and its
+    robots.txt Crawl-delay, doubles when the host answers 429/503, stretches to
+    the observed latency when the host slows down, and relaxes back towards
+    the base interval on fast successful responses.
+    """
+
+    def __init__(self, default_delay: float = 2.0, fetch_robots=None,
+                 robots_cache_file: Optional[str] = None, robots_ttl: float = 86400,
+                 capacity: float = 1.0, slow_threshold: float = 5.0, max_delay: float = 60.0):
+        self.default_delay = default_delay
+        self.fetch_robots = fetch_robots
+        self.robots_cache_file = robots_cache_file
+        self.robots_ttl = robots_ttl
+        self.capacity = capacity
+        self.slow_threshold = slow_threshold
+        self.max_delay = max_delay
+        
+        self._buckets = {}
+        self._guard = threading.Lock()
+        self._robots_lock = threading.Lock()
+        self._robots = self._load_robots_cache()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.replace('www.', '')
+
+    def _load_robots_cache(self) -> Dict:
+        if not self.robots_cache_file:
+            return {}
+        try:
+            with open(self.robots_cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        """Return the robots.txt Crawl-delay for url's host, fetching it at most once per robots_ttl"""
+        host = self.host_of(url)
+        
+        with self._robots_lock:
+            entry = self._robots.get(host)
+            if entry and time.time() - entry['fetched_at'] < self.robots_ttl:
+                return entry['crawl_delay']
+        
+        crawl_delay = None
+        sitemaps = []
+        if self.fetch_robots:
+            parsed = urlparse(url)
+            robots_text = self.fetch_robots(f"{parsed.scheme}://{parsed.netloc}/robots.txt")
+            if robots_text:
+                parser = RobotFileParser()
+                parser.parse(robots_text.splitlines())
+                sitemaps = parser.site_maps() or []
+                crawl_delay = parser.crawl_delay('*')
+                request_rate = parser.request_rate('*')
+                if request_rate and request_rate.requests:
+                    crawl_delay = max(crawl_delay or 0, request_rate.seconds / request_rate.requests)
+                if crawl_delay is not None:
+                    crawl_delay = min(float(crawl_delay), self.max_delay)
+                    logger.info(f"{host} robots.txt asks for a {crawl_delay:.1f}s crawl delay")
+        
+        entry = {'crawl_delay': crawl_delay, 'sitemaps': sitemaps, 'fetched_at': time.time()}
+        with self._robots_lock:
+            self._robots[host] = entry
+        if self.robots_cache_file:
+            _merge_json_file(self.robots_cache_file, {host: entry})
+        return crawl_delay
+
+    def sitemaps(self, url: str) -> List[str]:
+        """Sitemap URLs listed in the robots.txt of url's host, if it was looked up"""
+        with self._robots_lock:
+            entry = self._robots.get(self.host_of(url))
+        return entry.get('sitemaps', []) if entry else []
+
+    def _bucket(self, url: str) -> Dict:
+        host = self.host_of(url)
+        with self._guard:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = {
+                    'lock': threading.Lock(),
+                    'ready': threading.Event(),
+                    'interval': None,
+                    'base_interval': None,
+                    'tokens': self.capacity,
+                    'updated': time.monotonic()
+                }
+                is_new = True
+            else:
+                is_new = False
+        
+        # The first caller for a host looks up robots.txt, later callers wait for it
+        if is_new:
+            try:
+                crawl_delay = self.crawl_delay(url)
+            except Exception as e:
+                logger.debug(f"robots.txt lookup failed for {host}: {e}")
+                crawl_delay = None
+            base_interval = max(self.default_delay, crawl_delay or 0)
+            with bucket['lock']:
+                bucket['interval'] = bucket['base_interval'] = base_interval
+            bucket['ready'].set()
+        else:
+            bucket['ready'].wait()
+        return bucket
+
+    def _refill(self, bucket: Dict, now: float):
+        elapsed = now - bucket['updated']
+        bucket['tokens'] = min(self.capacity, bucket['tokens'] + elapsed / bucket['interval'])
+        bucket['updated'] = now
+
+    def ready_in(self, url: str) -> float:
+        """Seconds until a request to url's host may be sent (0 for unseen hosts)"""
+        with self._guard:
+            bucket = self._buckets.get(self.host_of(url))
+        if bucket is None or not bucket['ready'].is_set():
+            return 0.0
+        with bucket['lock']:
+            self._refill(bucket, time.monotonic())
+            return max(0.0, (1 - bucket['tokens']) * bucket['interval'])
+
+    def acquire(self, url: str):
+        """Take a token for url's host, sleeping only as long as that host requires"""
+        bucket = self._bucket(url)
+        with bucket['lock']:
+            self._refill(bucket, time.monotonic())
+            # Reserve the token even if it is not there yet, so concurrent
+            # callers for the same host queue up one interval apart
+            wait = max(0.0, (1 - bucket['tokens']) * bucket['interval'])
+            bucket['tokens'] -= 1
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, url: str, status_code: Optional[int], latency: float, retry_after: Optional[str] = None):
+        """Adapt the host's interval to how it answered"""
+        bucket = self._bucket(url)
+        host = self.host_of(url)
+        
+        with bucket['lock']:
+            interval = bucket['interval']
+            if status_code in (429, 503):
+                interval = max(interval * 2, self._parse_retry_after(retry_after))
+                logger.warning(f"{host} answered {status_code}, slowing down to one request per {min(interval, self.max_delay):.1f}s")
+            elif status_code is None or latency > self.slow_threshold:
+                interval = max(interval, latency)
+            else:
+                interval = max(bucket['base_interval'], interval * 0.75)
+            bucket['interval'] = min(interval, self.max_delay)
+
+    @staticmethod
+    def _parse_retry_after(retry_after: Optional[str]) -> float:
+        if not retry_after:
+            return 0.0
+        try:
+            return float(retry_after)
+        except ValueError:
+            return 0.0
+
+class SourceHealth:
+    """
+    Per-site health record kept across runs, with a circuit breaker.
+    
+    After failure_threshold consecutive failed runs (errors, HTTP errors or
+    zero articles) a site's circuit opens and the site is skipped until a
+    cooldown passes. The cooldown doubles with every further failed probe,
+    up to max_cooldown_days, and a successful probe closes the circuit.
+    """
+
+    def __init__(self, health_file: str = "cache/health.json", failure_threshold: int = 3,
+                 base_cooldown_days: float = 1.0, max_cooldown_days: float = 14.0):
+        self.health_file = health_file
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown_days * 86400
+        self.max_cooldown = max_cooldown_days * 86400
+        self._lock = threading.Lock()
+        self.sites = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.health_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, site_url: str):
+        with self._lock:
+            record = dict(self.sites[site_url])
+        _merge_json_file(self.health_file, {site_url: record})
+
+    def should_attempt(self, site_url: str) -> bool:
+        """False while the site's circuit is open; True when closed or due for a probe"""
+        with self._lock:
+            record = self.sites.get(site_url)
+            return not record or time.time() >= record.get('open_until', 0)
+
+    def record(self, site_url: str, status_code: Optional[int], latency: float,
+               article_count: int, error: Optional[str] = None):
+        """Record the outcome of one scrape of site_url"""
+        success = error is None and article_count > 0
+        
+        with self._lock:
+            record = self.sites.setdefault(site_url, {
+                'runs': 0, 'successes': 0, 'consecutive_failures': 0,
+                'avg_latency': 0.0, 'wasted_seconds': 0.0, 'total_articles': 0,
+                'status_codes': {}, 'open_until': 0
+            })
+            record['runs'] += 1
+            record['avg_latency'] += (latency - record['avg_latency']) / record['runs']
+            record['total_articles'] += article_count
+            record['last_articles'] = article_count
+            record['last_status'] = status_code
+            record['last_error'] = error
+            record['last_run'] = time.time()
+            status_key = str(status_code) if status_code is not None else 'error'
+            record['status_codes'][status_key] = record['status_codes'].get(status_key, 0) + 1
+            
+            if success:
+                record['successes'] += 1
+                record['consecutive_failures'] = 0
+                record['open_until'] = 0
+                record['last_success'] = time.time()
+            else:
+                record['consecutive_failures'] += 1
+                record['wasted_seconds'] += latency
+                failures_over = record['consecutive_failures'] - self.failure_threshold
+                if failures_over >= 0:
+                    cooldown = min(self.base_cooldown * (2 ** failures_over), self.max_cooldown)
+                    record['open_until'] = time.time() + cooldown
+                    logger.warning(f"Circuit open for {site_url} after {record['consecutive_failures']} "
+                                   f"failed runs, next probe in {cooldown / 86400:.1f} days")
+        self.save(site_url)
+
+    def print_summary(self):
+        """Print a per-site health table, worst time-wasters first"""
+        with self._lock:
+            rows = sorted(self.sites.items(), key=lambda item: item[1]['wasted_seconds'], reverse=True)
+        
+        print(f"\n{'Source':<45} {'Runs':>5} {'OK%':>5} {'Latency':>8} {'Wasted':>8} {'Articles':>9} {'Last':>6}  State")
+        for site_url, record in rows:
+            ok_rate = 100 * record['successes'] / record['runs'] if record['runs'] else 0
+            last = record.get('last_status') or 'err'
+            state = 'open' if time.time() < record.get('open_until', 0) else 'closed'
+            print(f"{site_url:<45} {record['runs']:>5} {ok_rate:>4.0f}% {record['avg_latency']:>7.1f}s "
+                  f"{record['wasted_seconds']:>7.1f}s {record['total_articles']:>9} {last:>6}  {state}")
+
+class StrategyCache:
+    """
+    Remembers which extraction strategy and selectors won for each domain.
+    
+    Entries carry hit/miss counts; an entry is replaced when the full cascade
+    finds a new winner and dropped after max_misses misses in a row.
+    """
+
+    def __init__(self, strategies_file: str = "cache/strategies.json", max_misses: int = 3):
+        self.strategies_file = strategies_file
+        self.max_misses = max_misses
+        self._lock = threading.Lock()
+        try:
+            with open(strategies_file, 'r', encoding='utf-8') as f:
+                self.domains = json.load(f)
+        except (OSError, ValueError):
+            self.domains = {}
+
+    def get(self, domain: str) -> Optional[Dict]:
+        with self._lock:
+            return self.domains.get(domain)
+
+    def learn(self, domain: str, strategy: str, selectors: List[str]):
+        with self._lock:
+            entry = self.domains.get(domain)
+            if entry and entry['strategy'] == strategy and entry['selectors'] == selectors:
+                entry['hits'] += 1
+                entry['misses'] = 0
+            else:
+                entry = self.domains[domain] = {'strategy': strategy, 'selectors': selectors,
+                                                'hits': 1, 'misses': 0}
+            entry['score'] = self._score(entry)
+        self._save(domain)
+
+    def record_hit(self, domain: str):
+        with self._lock:
+            entry = self.domains[domain]
+            entry['hits'] += 1
+            entry['misses'] = 0
+            entry['score'] = self._score(entry)
+        self._save(domain)
+
+    def record_miss(self, domain: str):
+        with self._lock:
+            entry = self.domains[domain]
+            entry['misses'] += 1
+            entry['score'] = self._score(entry)
+            if entry['misses'] >= self.max_misses:
+                self.domains[domain] = None
+        self._save(domain)
+
+    @staticmethod
+    def _score(entry: Dict) -> float:
+        return round(entry['hits'] / (entry['hits'] + entry['misses']), 3)
+
+    def _save(self, domain: str):
+        # A dropped entry is saved as null so the merge removes it for later runs
+        with self._lock:
+            entry = self.domains.get(domain)
+            entry = dict(entry) if entry else None
+        _merge_json_file(self.strategies_file, {domain: entry})
+
+JOURNAL_MAX_AGE = 12 * 3600  # an older interrupted run is started over, not resumed
+
+class CompiledTemplate:
+    """
+    A report template split once into literal text and {field} slots.
+
+    Only a lower-case name in single braces is a field, so the CSS blocks
+    in the template are left alone; fields without a value are kept as
+    written, as the old str.replace() filling did.
+    """
+
+    FIELD_RE = re.compile(r'\{([a-z_]+)\}')
+
+    def __init__(self, text: str):
+        self.text = text
+        # Alternating literal text and field names, starting and ending with text
+        self.parts = self.FIELD_RE.split(text)
+
+    def _chunks(self, parts: List[str], values: Dict[str, str]):
+        for index, part in enumerate(parts):
+            if index % 2 == 0:
+                yield part
+            else:
+                value = values.get(part)
+                yield '{' + part + '}' if value is None else value
+
+    def render(self, values: Dict[str, str]) -> str:
+        return ''.join(self._chunks(self.parts, values))
+
+    def render_around(self, field: str, values: Dict[str, str]) -> Tuple[str, str]:
+        """The rendered text before and after the first occurrence of field"""
+        positions = [index for index in range(1, len(self.parts), 2) if self.parts[index] == field]
+        if not positions:
+            return self.render(values), ''
+        split_at = positions[0]
+        return (''.join(self._chunks(self.parts[:split_at], values)),
+                ''.join(self._chunks(self.parts[split_at + 1:], values)))
+
+_compiled_templates = {}
+_compiled_templates_lock = threading.Lock()
+
+def load_compiled_template(template_file: str) -> CompiledTemplate:
+    """
+    Compile a template file once and reuse it until the file's mtime or size
+    changes. Raises OSError if it cannot be read.
+    """
+    stat = os.stat(template_file)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _compiled_templates_lock:
+        cached = _compiled_templates.get(template_file)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    with open(template_file, 'r', encoding='utf-8') as f:
+        template = CompiledTemplate(f.read())
+    with _compiled_templates_lock:
+        _compiled_templates[template_file] = (version, template)
+    return template
+
+class FragmentCache:
+    """
+    Rendered article cards per site, shared by every report that shows the
+    same articles.
+
+    Entries are keyed by the site and a hash of everything the cards show,
+    so the combined report reuses the sections already rendered for the
+    category reports, and a site whose articles did not change since an
+    earlier run is not rendered again. The max_entries most recently used
+    entries are kept in memory and all of them on disk (one file per key)
+    across runs; files unused for max_age_days are removed.
+    """
+
+    # Bump when render_article_card output changes, to retire old entries
+    VERSION = 1
+
+    def __init__(self, cache_dir: Optional[str] = "cache/fragments", max_age_days: float = 7.0,
+                 max_entries: int = 512):
+        self.cache_dir = cache_dir
+        self.max_age = max_age_days * 86400
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.evict()
+
+    def key(self, site: str, articles: List[Article]) -> str:
+        digest = hashlib.sha256(f"{self.VERSION}\x1e{site}".encode('utf-8'))
+        for article in articles:
+            fields = [article.title, article.url, article.summary, article.published_date,
+                      article.author or '', '1' if article.is_new else '0']
+            fields.extend(f"{source}\x1d{url}" for source, url in article.alternates)
+            digest.update(('\x1e' + '\x1f'.join(fields)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.html")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._memory_lock:
+            cards = self._memory.get(key)
+            if cards is not None:
+                self._memory.move_to_end(key)
+        if cards is None and self.cache_dir:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    cards = f.read()
+                os.utime(self._path(key))
+            except OSError:
+                pass
+            else:
+                self._remember(key, cards)
+        if cards is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cards
+
+    def _remember(self, key: str, cards: str):
+        """Keep an entry in memory, dropping the least recently used beyond max_entries"""
+        with self._memory_lock:
+            self._memory[key] = cards
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def put(self, key: str, cards: str):
+        self._remember(key, cards)
+        if self.cache_dir:
+            try:
+                atomic_write(self._path(key), cards)
+            except OSError as e:
+                logger.warning(f"Could not write fragment cache entry {key}: {e}")
+
+    def evict(self):
+        """Drop entries not used for max_age_days"""
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if name.endswith('.tmp') or now - os.stat(path).st_mtime > self.max_age:
+                    os.remove(path)
+            except OSError:
+                continue
+
+def _site_heading(site: str, site_type: str) -> Tuple[str, str, str]:
+    """(bare domain, display name, CSS class) for a results key such as 'lwn.net' or 'linux_lwn.net'"""
+    # Handle prefixed site names for combined reports
+    if site.startswith(('tech_', 'security_', 'robotics_', 'linux_')):
+        prefix, actual_site = site.split('_', 1)
+        site_display = actual_site.replace('.com', '').replace('.', ' ').title()
+        site_class = f"{prefix}-prefix"
+        
+        # Add appropriate emoji based on prefix
+        emoji_map = {
+            "tech": "🚀",
+            "security": "🔒", 
+            "robotics": "🤖",
+            "linux": "🐧"
+        }
+        site_display = f"{emoji_map.get(prefix, '📰')} {site_display}"
+    else:
+        actual_site = site
+        site_display = site.replace('.com', '').replace('.', ' ').title()
+        site_class = ""
+        
+        # Add emoji based on site type
+        emoji_map = {
+            "tech": "🚀",
+            "security": "🔒",
+            "robotics": "🤖", 
+            "linux": "🐧"
+        }
+        site_display = f"{emoji_map.get(site_type, '📰')} {site_display}"
+    
+    return actual_site, site_display, site_class
+
+def render_site_cards(site: str, articles: List[Article], fragments: Optional[FragmentCache] = None) -> str:
+    """
+    The article cards of one site. With a fragment cache, cards already
+    rendered for the same articles are reused.
+    """
+    key = None
+    if fragments:
+        key = fragments.key(site, articles)
+        cards = fragments.get(key)
+        if cards is not None:
+            return cards
+    cards = ''.join(render_article_card(article) for article in articles)
+    if fragments:
+        fragments.put(key, cards)
+    return cards
+
+def render_site_section(site: str, articles: List[Article], site_type: str = "tech",
+                        fragments: Optional[FragmentCache] = None, shard_url: Optional[str] = None) -> str:
+    """
+    HTML of one site's section in a report: header plus a card per article.
+    With shard_url the section is a collapsed <details> whose cards are
+    fetched from that JSON shard when the reader opens it.
+    """
+    actual_site, site_display, site_class = _site_heading(site, site_type)
+    site_initial = actual_site[0].upper()
+    
+    if shard_url and articles:
+        return f"""
+            <details class="site-section {site_class}" data-shard="{html.escape(shard_url)}">
+                <summary class="site-header">
+                    <div class="site-icon">{site_initial}</div>
+                    <h2 class="site-name">{site_display}</h2>
+                    <div class="article-count">{len(articles)} articles</div>
+                </summary>
+                <div class="articles-grid"></div>
+            </details>
+    """
+    
+    parts = [f"""
+            <div class="site-section {site_class}">
+                <div class="site-header">
+                    <div class="site-icon">{site_initial}</div>
+                    <h2 class="site-name">{site_display}</h2>
+                    <div class="article-count">{len(articles)} articles</div>
+                </div>
+    """]
+    
+    if articles:
+        parts.append('<div class="articles-grid">')
+        # Keyed on the bare domain so category and combined reports share entries
+        parts.append(render_site_cards(actual_site, articles, fragments))
+        parts.append('</div>')
+    else:
+        parts.append('<div class="no-articles">No articles found for this source.</div>')
+    
+    parts.append('</div>')
+    return ''.join(parts)
+
+def render_article_card(article: Article) -> str:
+    """HTML of one article card; scraped text is escaped"""
+    # Clean and truncate summary
+    summary = article.summary.replace('\n', ' ').strip()
+    if not summary:
+        summary = "No summary available."
+    
+    # Format author display
+    author_display = f'By {html.escape(article.author)}' if article.author else 'Unknown Author'
+    
+    # Format date
+    formatted_date = article.published.strftime('%b %d, %Y at %H:%M') if article.published else ''
+    
+    new_badge = '<span class="article-new">New</span>' if article.is_new else ''
+    
+    alternates_html = ''
+    if article.alternates:
+        links = ', '.join(
+            f'<a href="{html.escape(url)}" target="_blank" rel="noopener noreferrer">{html.escape(source)}</a>'
+            for source, url in article.alternates
+        )
+        alternates_html = f'\n                        <div class="article-alternates">Also covered by {links}</div>'
+    
+    return f"""
+                    <div class="article-card">
+                        <h3 class="article-title">
+                            {new_badge}<a href="{html.escape(article.url)}" target="_blank" rel="noopener noreferrer">
+                                {html.escape(article.title)}
+                            </a>
+                        </h3>
+                        <div class="article-summary">{html.escape(summary)}</div>{alternates_html}
+                        <div class="article-meta">
+                            <span class="article-author">{author_display}</span>
+                            <span class="article-date">{formatted_date}</span>
+                        </div>
+                    </div>
+    """
+
+class ArticleWriter:
+    """
+    Base for writers that append scrape results one site at a time.
+
+    Every write_site() is flushed, so the sites written so far survive a
+    crash later in the run; close() also fsyncs the file. With append=True
+    an existing file is continued instead of truncated. With atomic=True
+    the output goes to a temporary file that only replaces path once the
+    writer is closed without an error.
+    """
+
+    def __init__(self, path: str, append: bool = False, atomic: bool = False):
+        self.path = path
+        self.atomic = atomic and not append
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._write_path = _tmp_path(path) if self.atomic else path
+        self._file = open(self._write_path, 'a' if append else 'w', encoding='utf-8', newline='')
+        self.sites_written = 0
+        if self._file.tell() == 0:
+            self._begin()
+
+    def _begin(self):
+        pass
+
+    def _write_site(self, site: str, articles: List[Article]):
+        raise NotImplementedError
+
+    def _end(self):
+        pass
+
+    def write_site(self, site: str, articles: List[Article]):
+        self._write_site(site, articles)
+        self._file.flush()
+        self.sites_written += 1
+
+    def close(self, commit: bool = True):
+        if self._file.closed:
+            return
+        if self.atomic and not commit:
+            self._file.close()
+            os.remove(self._write_path)
+            return
+        self._end()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if self.atomic:
+            os.replace(self._write_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(commit=exc_type is None)
+
+class NDJSONWriter(ArticleWriter):
+    """
+    One JSON object per article and line, tagged with the site it came
+    from. Every site ends with a {"site": ..., "done": true} line, so a
+    site that returned no articles still leaves a record that it finished.
+    """
+
+    def _write_site(self, site, articles):
+        lines = [json.dumps({'site': site, 'category': article.category, **article.to_dict()}, ensure_ascii=False)
+                 for article in articles]
+        lines.append(json.dumps({'site': site, 'done': True}, ensure_ascii=False))
+        self._file.write('\n'.join(lines) + '\n')
+
+def read_ndjson(path: str, finished_only: bool = False) -> Dict[str, List[Article]]:
+    """
+    Articles per site from an NDJSON file, in file order. A line cut short
+    by a crash is skipped. finished_only keeps just the sites whose "done"
+    line was written, empty ones included, and drops a site cut off midway.
+    """
+    results = {}
+    finished = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            site = record.pop('site')
+            if record.get('done'):
+                finished.add(site)
+                results.setdefault(site, [])
+                continue
+            results.setdefault(site, []).append(Article.from_dict(record))
+    if finished_only:
+        return {site: articles for site, articles in results.items() if site in finished}
+    return results
+
+class JSONWriter(ArticleWriter):
+    """The {site: [article, ...]} layout of save_to_json, written one site at a time"""
+
+    def _begin(self):
+        self._file.write('{')
+
+    def _write_site(self, site, articles):
+        # Same text as json.dump(..., indent=2) of the whole dict
+        records = json.dumps([article.to_dict() for article in articles], indent=2, ensure_ascii=False)
+        records = records.replace('\n', '\n  ')
+        separator = ',' if self.sites_written else ''
+        self._file.write(f"{separator}\n  {json.dumps(site, ensure_ascii=False)}: {records}")
+
+    def _end(self):
+        self._file.write('\n}' if self.sites_written else '}')
+
+class CSVWriter(ArticleWriter):
+    """save_to_csv rows; the header is only written to a new file"""
+
+    def _begin(self):
+        csv.writer(self._file).writerow(Article.CSV_HEADER)
+
+    def _write_site(self, site, articles):
+        csv.writer(self._file).writerows(article.to_row() for article in articles)
+
+class HTMLFragmentWriter(ArticleWriter):
+    """Report site sections, ready to be placed into the page template"""
+
+    def __init__(self, path: str, site_type: str = "tech", append: bool = False, atomic: bool = False,
+                 fragments: Optional[FragmentCache] = None):
+        self.site_type = site_type
+        self.fragments = fragments
+        super().__init__(path, append, atomic)
+
+    def _write_site(self, site, articles):
+        self._file.write(render_site_section(site, articles, self.site_type, self.fragments))
+
+class HTMLReportWriter(HTMLFragmentWriter):
+    """
+    A complete report: the template up to {content}, one section per site,
+    then the rest of the template. The page totals go into the header
+    before any section is written, so they must be known up front.
+    """
+
+    def __init__(self, path: str, template: 'CompiledTemplate', values: Dict[str, str], site_type: str = "tech",
+                 fragments: Optional[FragmentCache] = None):
+        self._head, self._tail = template.render_around('content', values)
+        super().__init__(path, site_type, atomic=True, fragments=fragments)
+
+    def _begin(self):
+        self._file.write(self._head)
+
+    def _end(self):
+        self._file.write(self._tail)
+
+# Fills a <details data-shard> section from its JSON shard the first time it is opened
+SHARD_LOADER_SCRIPT = """
+            <script>
+                document.querySelectorAll('details[data-shard]').forEach(function (section) {
+                    section.addEventListener('toggle', function () {
+                        if (!section.open || section.dataset.loaded) return;
+                        section.dataset.loaded = 'yes';
+                        fetch(section.dataset.shard)
+                            .then(function (response) { return response.json(); })
+                            .then(function (shard) { section.querySelector('.articles-grid').innerHTML = shard.html; })
+                            .catch(function () { delete section.dataset.loaded; });
+                    });
+                });
+            </script>
+"""
+
+class ShardedReportWriter(HTMLReportWriter):
+    """
+    A report whose page holds only the site headers. Each site's cards go
+    to a JSON shard in shards/ next to the report, loaded when the reader
+    opens the section. Shards are named after a hash of their content, so
+    a site whose cards did not change keeps the same shard URL from one
+    report to the next, and browsers reuse their cached copy.
+    """
+
+    def __init__(self, path: str, template: 'CompiledTemplate', values: Dict[str, str], site_type: str = "tech",
+                 fragments: Optional[FragmentCache] = None):
+        self.shard_dir = os.path.join(os.path.dirname(path), 'shards')
+        self.shard_paths = []
+        super().__init__(path, template, values, site_type, fragments)
+
+    def _write_shard(self, site: str, articles: List[Article]) -> str:
+        actual_site = _site_heading(site, self.site_type)[0]
+        shard = json.dumps({
+            'site': actual_site,
+            'articles': len(articles),
+            'html': render_site_cards(actual_site, articles, self.fragments)
+        }, ensure_ascii=False)
+        name = f"{actual_site}-{hashlib.sha256(shard.encode('utf-8')).hexdigest()[:12]}.json"
+        path = os.path.join(self.shard_dir, name)
+        if not os.path.exists(path):
+            os.makedirs(self.shard_dir, exist_ok=True)
+            atomic_write(path, shard)
+        self.shard_paths.append(path)
+        return f"shards/{name}"
+
+    def _write_site(self, site, articles):
+        shard_url = self._write_shard(site, articles) if articles else None
+        self._file.write(render_site_section(site, articles, self.site_type, self.fragments, shard_url))
+
+    def _end(self):
+        self._file.write(SHARD_LOADER_SCRIPT)
+        super()._end()
+
+# Elements whose whitespace is significant and left exactly as written
+_VERBATIM_RE = re.compile(r'(<(script|pre|textarea)\b.*?</\2>)', re.DOTALL | re.IGNORECASE)
+_HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+_STYLE_BLOCK_RE = re.compile(r'<style>(.*?)</style>', re.DOTALL)
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+
+def _collapse_whitespace(match) -> str:
+    # A browser renders any whitespace run as one space, so this never
+    # changes layout; keeping a newline keeps the output diffable
+    return '\n' if '\n' in match.group(0) else ' '
+
+def minify_html(text: str) -> str:
+    """Drop comments and collapse whitespace runs outside script, pre and textarea"""
+    pieces = _VERBATIM_RE.split(text)
+    # split() yields text, whole verbatim element, its tag name, text, ...
+    for index in range(0, len(pieces), 3):
+        piece = _HTML_COMMENT_RE.sub('', pieces[index])
+        pieces[index] = _WHITESPACE_RE.sub(_collapse_whitespace, piece)
+    del pieces[2::3]
+    return ''.join(pieces).strip() + '\n'
+
+def minify_css(css: str) -> str:
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = _WHITESPACE_RE.sub(' ', css)
+    css = _CSS_PUNCTUATION_RE.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+def write_compressed_siblings(path: str) -> Dict[str, int]:
+    """Write path.gz (and path.br with brotli installed); return the size of each variant"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    sizes = {'': len(data)}
+    # mtime=0 keeps the .gz byte-identical when the content is, so git sees no change
+    compressed = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli:
+        compressed['.br'] = brotli.compress(data, quality=11)
+    for suffix, payload in compressed.items():
+        atomic_write(path + suffix, payload, 'wb')
+        sizes[suffix] = len(payload)
+    return sizes
+
+def externalize_styles(text: str, asset_dir: str) -> str:
+    """
+    Move inline <style> blocks into a stylesheet named after a hash of its
+    content, written once to asset_dir and linked from the page. Every
+    report built from the same template shares that one file, and its name
+    changes whenever the CSS does.
+    """
+    css = '\n'.join(minify_css(block) for block in _STYLE_BLOCK_RE.findall(text))
+    if not css:
+        return text
+    
+    name = f"news-{hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]}.css"
+    path = os.path.join(asset_dir, name)
+    if not os.path.exists(path):
+        os.makedirs(asset_dir, exist_ok=True)
+        # Category reports are compacted in parallel and may race to write it
+        atomic_write(path, css)
+        write_compressed_siblings(path)
+    
+    link = f'<link rel="stylesheet" href="{name}">'
+    text = _STYLE_BLOCK_RE.sub('', text)
+    return text.replace('</head>', f"{link}</head>", 1)
+
+def compact_report(path: str) -> Dict[str, int]:
+    """
+    Rewrite a report in place with its CSS in the shared stylesheet and its
+    markup minified, then write compressed siblings. Returns the byte sizes
+    before and after: 'original', 'minified', 'gz' and, with brotli, 'br'.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    original = len(text.encode('utf-8'))
+    
+    text = minify_html(externalize_styles(text, os.path.dirname(path) or '.'))
+    atomic_write(path, text)
+    
+    sizes = write_compressed_siblings(path)
+    stats = {'original': original, 'minified': sizes['']}
+    stats.update({suffix[1:]: size for suffix, size in sizes.items() if suffix})
+    return stats
+
+def compact_reports(paths: List[str]) -> Dict[str, int]:
+    """Compact several reports and print how many bytes that saved"""
+    totals = {}
+    for path in paths:
+        for key, size in compact_report(path).items():
+            totals[key] = totals.get(key, 0) + size
+    if totals:
+        served = totals.get('br', totals['gz'])
+        print(f"📦 {len(paths)} reports: {totals['original'] / 1024:.0f} KB -> {totals['minified'] / 1024:.0f} KB minified, "
+              f"{served / 1024:.0f} KB served compressed ({1 - served / totals['original']:.0%} saved)")
+    return totals
+
+REPORT_FILE_RE = re.compile(r'^(tech|security|robotics|linux)_news_(?:security_)?(\d{8})_(\d{6})\.html$')
+
+def report_category(filename: str) -> Optional[str]:
+    """Category of a category report file name, or None for combined, custom and other files"""
+    match = REPORT_FILE_RE.match(os.path.basename(filename))
+    if not match:
+        return None
+    # tech_news_security_* is an early name of the security report
+    return 'security' if '_news_security_' in filename else match.group(1)
+
+# Every saved report, combined and custom ones included, ends in _YYYYMMDD_HHMMSS.html
+REPORT_TIME_RE = re.compile(r'_(\d{8})_(\d{6})\.html$')
+
+def report_time(filename: str) -> Optional[datetime]:
+    """When a report was written, from its file name"""
+    match = REPORT_TIME_RE.search(os.path.basename(filename))
+    return datetime.strptime(match.group(1) + match.group(2), '%Y%m%d%H%M%S') if match else None
+
+def _read_cards(container, category: Optional[str], fallback_date: Optional[datetime]) -> List[Article]:
+    """Articles of the .article-card elements under a parsed report element"""
+    articles = []
+    for card in container.select('.article-card'):
+        link = card.select_one('.article-title a[href]')
+        if not link:
+            continue
+        summary = card.select_one('.article-summary')
+        summary = summary.get_text(strip=True) if summary else ''
+        author = card.select_one('.article-author')
+        author = author.get_text(strip=True) if author else ''
+        date = card.select_one('.article-date')
+        try:
+            published = datetime.strptime(date.get_text(strip=True), '%b %d, %Y at %H:%M')
+        except (AttributeError, ValueError):
+            published = fallback_date
+        
+        url = link['href']
+        articles.append(Article(
+            # Collapse the line breaks and non-breaking spaces of the pretty-printed markup
+            title=' '.join(link.get_text(' ').split()),
+            url=url,
+            summary='' if summary == 'No summary available.' else summary,
+            published_date=published,
+            source=urlparse(url).netloc.replace('www.', ''),
+            author=author[3:] if author.startswith('By ') else None,
+            category=category
+        ))
+    return articles
+
+def read_report(path: str, parser: Optional[str] = None, content: Optional[bytes] = None) -> List[Article]:
+    """
+    Articles of a saved HTML report, read back from its cards. Dates come
+    from the card ("Sep 07, 2025 at 12:01"), falling back to the report
+    time in the file name. The category comes from the file name, or for
+    combined reports from each site section's "<category>-prefix" class.
+    Sections of a sharded report are read from their shards/ files.
+    content is the report's bytes when it is not at path, e.g. archived.
+    """
+    backend = select_parser_backend(parser)
+    if content is None:
+        with open(path, 'rb') as f:
+            content = f.read()
+    soup = BeautifulSoup(content, backend)
+    
+    written = report_time(path)
+    category = report_category(path)
+    
+    articles = []
+    for section in soup.select('.site-section') or [soup]:
+        section_category = category or next(
+            (cls[:-len('-prefix')] for cls in section.get('class', []) if cls.endswith('-prefix')), None)
+        shard_url = section.get('data-shard')
+        if shard_url:
+            try:
+                with open(os.path.join(os.path.dirname(path), shard_url), 'r', encoding='utf-8') as f:
+                    section = BeautifulSoup(json.load(f)['html'], backend)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping shard {shard_url} of {path}: {e}")
+                continue
+        articles.extend(_read_cards(section, section_category, written))
+    return articles
 
 class TechNewsScraper:
-    def __init__(self, delay: float = 2.0):
+    def __init__(self, delay: float = 2.0, max_workers: int = 1, cache_dir: Optional[str] = None,
+                 state_dir: Optional[str] = None, parser: Optional[str] = None, single_pass: bool = True,
+                 use_feeds: bool = True, compact_output: bool = False):
         """
         Initialize scraper with rate limiting delay
+
+        delay is the minimum interval between two requests to the same host;
+        robots.txt Crawl-delay and throttling responses can widen it per host.
+        max_workers > 1 fetches different hosts in parallel.
+        cache_dir enables the conditional-request cache for homepage fetches.
+        state_dir persists per-host state such as robots.txt lookups, source
+        health, discovered feeds and the winning extraction strategy, plus the
+        index of already harvested article URLs, the queryable article store
+        and already rendered report sections, across runs.
+        parser picks the BeautifulSoup backend; by default the fastest installed one.
+        single_pass answers all selectors from one walk of the page instead of
+        one soupsieve pass per selector.
+        use_feeds reads a site's RSS/Atom feed or news sitemap when it has one
+        and only falls back to scraping the homepage HTML otherwise.
+        compact_output minifies saved HTML reports, moves their CSS into a
+        shared stylesheet and writes .gz/.br copies next to them.
         """
         self.delay = delay
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
+        self.parser = select_parser_backend(parser)
+        self.single_pass = single_pass
+        self.compact_output = compact_output
+        self.max_workers = max(1, max_workers)
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        
+        # requests.Session is not thread-safe, so each worker gets its own
+        self._local = threading.local()
+        
+        self.rate_limiter = HostRateLimiter(
+            default_delay=delay,
+            fetch_robots=self._fetch_robots_txt,
+            robots_cache_file=os.path.join(state_dir, 'robots.json') if state_dir else None
+        )
+        self.health = SourceHealth(os.path.join(state_dir, 'health.json')) if state_dir else None
+        self.strategies = StrategyCache(os.path.join(state_dir, 'strategies.json')) if state_dir else None
+        self.seen = SeenArticleIndex(os.path.join(state_dir, 'seen.sqlite')) if state_dir else None
+        self.store = ArticleStore(os.path.join(state_dir, 'articles.sqlite')) if state_dir else None
+        self.fragments = FragmentCache(os.path.join(state_dir, 'fragments')) if state_dir else None
+        if use_feeds:
+            self.feeds = FeedDirectory(os.path.join(state_dir, 'feeds.json') if state_dir else None)
+        else:
+            self.feeds = None
+
+    @property
+    def session(self):
+        """Return the requests session for the current thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1'
+            })
+            self._local.session = session
+        return session
+
+    def _fetch_robots_txt(self, robots_url: str) -> Optional[str]:
+        """Download robots.txt, returning None when the host has none"""
+        try:
+            response = self.session.get(robots_url, timeout=10)
+        except requests.RequestException:
+            return None
+        return response.text if response.status_code == 200 else None
+
+    def _fetch(self, url: str, timeout: float = 15, headers: Optional[Dict[str, str]] = None,
+               retries: int = 0, backoff: float = 1.0):
+        """
+        GET url through the per-host rate limiter, feeding the response back into it.
+        
+        Timeouts, dropped connections and 429/5xx answers are retried up to
+        `retries` times with exponential backoff. A host that does not
+        resolve or refuses the connection fails at once: it is down or gone,
+        and retrying would only add the backoff to every dead site.
+        """
+        for attempt in range(retries + 1):
+            self.rate_limiter.acquire(url)
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, timeout=timeout, headers=headers)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                self.rate_limiter.record(url, None, time.monotonic() - start)
+                if attempt == retries or _host_unreachable(e):
+                    raise
+            else:
+                self.rate_limiter.record(url, response.status_code, time.monotonic() - start,
+                                         response.headers.get('Retry-After'))
+                if response.status_code not in (429, 500, 502, 503, 504) or attempt == retries:
+                    return response
+            
+            logger.info(f"Retrying {url} (attempt {attempt + 2} of {retries + 1})")
+            time.sleep(backoff * (2 ** attempt))
+
+    def parse_html(self, content):
+        """Parse a page with the configured parser backend"""
+        return BeautifulSoup(content, self.parser)
 
     def scrape_site_adaptive(self, site_url: str, max_articles: int = 10) -> List[Article]:
         """
         Adaptive scraping that tries multiple selector strategies
         """
-        articles = []
         domain = urlparse(site_url).netloc.replace('www.', '')
         
+        if self.health and not self.health.should_attempt(site_url):
+            logger.info(f"Skipping {domain}: circuit open after repeated failures")
+            return []
+        
+        articles = []
+        status_code = None
+        error = None
+        start = time.monotonic()
+        
         try:
-            logger.info(f"Fetching {site_url}...")
-            response = self.session.get(site_url, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Strategy 1: Look for common article patterns
-            articles = self._try_article_selectors(soup, site_url, domain, max_articles)
-            
-            if not articles:
-                # Strategy 2: Look for headline links
-                articles = self._try_headline_selectors(soup, site_url, domain, max_articles)
-            
-            if not articles:
-                # Strategy 3: Look for any links that might be articles
-                articles = self._try_generic_link_patterns(soup, site_url, domain, max_articles)
-            
-            logger.info(f"Scraped {len(articles)} articles from {domain}")
-            
+            articles, status_code = self._scrape_site(site_url, domain, max_articles)
         except Exception as e:
+            response = getattr(e, 'response', None)
+            status_code = response.status_code if response is not None else None
+            error = str(e)
             logger.error(f"Error scraping {site_url}: {e}")
         
-        time.sleep(self.delay)
+        if self.health:
+            self.health.record(site_url, status_code, time.monotonic() - start, len(articles), error)
+        
         return articles
 
-    def _try_article_selectors(self, soup, site_url, domain, max_articles):
-        """Try common article container selectors"""
-        articles = []
+    def _scrape_site(self, site_url: str, domain: str, max_articles: int):
+        """Fetch and extract one site, returning (articles, HTTP status)"""
+        feed_url = self.feeds.feed_url(site_url) if self.feeds else None
+        if feed_url:
+            def extract_feed(response):
+                return parse_feed(response.content, domain, max_articles)
+            
+            try:
+                articles, status_code = self._fetch_cached(feed_url, domain, max_articles, extract_feed)
+                if articles:
+                    return articles, status_code
+                logger.info(f"Feed {feed_url} has no articles, forgetting it")
+                self.feeds.remember(site_url, None)
+            except Exception as e:
+                # Transient failures only skip the feed for this run
+                if _feed_gone(e):
+                    logger.info(f"Feed {feed_url} is gone ({e}), forgetting it")
+                    self.feeds.remember(site_url, None)
+                else:
+                    logger.info(f"Feed {feed_url} failed ({e}), falling back to the homepage")
         
-        article_selectors = [
-            'article',
-            '.post', '.entry', '.story',
-            '[class*="article"]', '[class*="post"]', '[class*="story"]',
-            '.content-item', '.feed-item', '.news-item'
-        ]
+        def extract_homepage(response):
+            return self._extract_homepage(response, site_url, domain, max_articles)
+        
+        return self._fetch_cached(site_url, domain, max_articles, extract_homepage)
+
+    def _fetch_cached(self, url: str, domain: str, max_articles: int, extract):
+        """
+        Fetch url through the response cache and turn it into articles with
+        extract(response); returns (articles, HTTP status)
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached.get('max_articles') != max_articles:
+            cached = None
+        
+        logger.info(f"Fetching {url}...")
+        response = self._fetch(url, headers=self.cache.conditional_headers(cached) if self.cache else None,
+                               retries=2)
+        
+        if response.status_code == 304 and cached:
+            self.cache.touch(url, cached)
+            articles = ResponseCache.articles_from_entry(cached)
+            logger.info(f"{domain} not modified, reused {len(articles)} cached articles")
+            return articles, response.status_code
+        
+        response.raise_for_status()
+        
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        if cached and cached.get('body_hash') == body_hash:
+            self.cache.touch(url, cached)
+            articles = ResponseCache.articles_from_entry(cached)
+            logger.info(f"{domain} body unchanged, reused {len(articles)} cached articles")
+            return articles, response.status_code
+        
+        articles = extract(response)
+        
+        logger.info(f"Scraped {len(articles)} articles from {domain}")
+        
+        if self.cache:
+            self.cache.put(url, response, body_hash, articles, max_articles)
+        
+        return articles, response.status_code
+
+    def _extract_homepage(self, response, site_url: str, domain: str, max_articles: int) -> List[Article]:
+        """Switch to the site's feed when the homepage advertises one, else run the HTML strategies"""
+        soup = self.parse_html(response.content)
+        
+        if self.feeds and self.feeds.needs_discovery(site_url):
+            feed_url = discover_feed_url(soup, site_url) or self._news_sitemap_url(site_url)
+            if feed_url:
+                try:
+                    feed_response = self._fetch(feed_url, retries=1)
+                    feed_response.raise_for_status()
+                    articles = parse_feed(feed_response.content, domain, max_articles)
+                except Exception as e:
+                    logger.info(f"Feed {feed_url} for {domain} is unusable: {e}")
+                    if not _feed_gone(e):
+                        # Check again on the next run rather than after recheck_days
+                        return self.extract_articles(soup, site_url, domain, max_articles)
+                    articles = []
+                if articles:
+                    logger.info(f"Using feed {feed_url} for {domain} from now on")
+                    self.feeds.remember(site_url, feed_url)
+                    return articles
+            self.feeds.remember(site_url, None)
+        
+        return self.extract_articles(soup, site_url, domain, max_articles)
+
+    def _news_sitemap_url(self, site_url: str) -> Optional[str]:
+        """A Google News sitemap from robots.txt, only for sites configured at the host root"""
+        if urlparse(site_url).path.strip('/'):
+            return None
+        for sitemap_url in self.rate_limiter.sitemaps(site_url):
+            if 'news' in sitemap_url.lower():
+                return sitemap_url
+        return None
+
+    def extract_articles(self, soup, site_url: str, domain: str, max_articles: int) -> List[Article]:
+        """
+        Run the adaptive selector strategies against a parsed page.
+        
+        When a strategy has already won for this domain it is tried first on
+        its own, and the full cascade only runs if it stops yielding articles.
+        In single-pass mode the selectors of each step are answered from one
+        walk of the page.
+        """
+        learned = self.strategies.get(domain) if self.strategies else None
+        if learned:
+            candidates = self._candidates(soup, learned['selectors'])
+            articles, _ = self._run_strategy(learned['strategy'], candidates, site_url, domain, max_articles,
+                                             learned['selectors'])
+            if articles:
+                self.strategies.record_hit(domain)
+                return articles
+            logger.info(f"Learned {learned['strategy']} strategy no longer works for {domain}, running full cascade")
         
-        for selector in article_selectors:
+        candidates = self._candidates(soup, self.ARTICLE_SELECTORS + self.HEADLINE_SELECTORS)
+        for strategy in ('article', 'headline', 'generic'):
+            articles, used_selectors = self._run_strategy(strategy, candidates, site_url, domain, max_articles)
+            if articles:
+                if self.strategies:
+                    self.strategies.learn(domain, strategy, used_selectors)
+                return articles
+        
+        if learned:
+            self.strategies.record_miss(domain)
+        return []
+
+    def _candidates(self, soup, selectors: List[str]):
+        """Index the page for selectors in single-pass mode, else hand back the soup"""
+        return CandidateIndex(soup, selectors) if self.single_pass else soup
+
+    def _run_strategy(self, strategy: str, soup, site_url: str, domain: str, max_articles: int,
+                      selectors: Optional[List[str]] = None):
+        """Run one named strategy, returning (articles, selectors it used)"""
+        if strategy == 'article':
+            # Strategy 1: Look for common article patterns
+            return self._try_article_selectors(soup, site_url, domain, max_articles, selectors)
+        if strategy == 'headline':
+            # Strategy 2: Look for headline links
+            return self._try_headline_selectors(soup, site_url, domain, max_articles, selectors)
+        # Strategy 3: Look for any links that might be articles
+        return self._try_generic_link_patterns(soup, site_url, domain, max_articles), []
+
+    ARTICLE_SELECTORS = [
+        'article',
+        '.post', '.entry', '.story',
+        '[class*="article"]', '[class*="post"]', '[class*="story"]',
+        '.content-item', '.feed-item', '.news-item'
+    ]
+
+    HEADLINE_SELECTORS = [
+        'h1 a[href]', 'h2 a[href]', 'h3 a[href]',
+        '.headline a', '.title a', '.entry-title a',
+        '[class*="headline"] a', '[class*="title"] a',
+        'a[href*="/2024/"]', 'a[href*="/2025/"]',  # Year-based URLs
+    ]
+
+    def _try_article_selectors(self, soup, site_url, domain, max_articles, selectors=None):
+        """Try common article container selectors, returning (articles, [winning selector])"""
+        articles = []
+        
+        for selector in selectors or self.ARTICLE_SELECTORS:
             elements = soup.select(selector)
             if len(elements) >= 3:  # Only proceed if we find multiple elements
                 logger.debug(f"Trying article selector: {selector} (found {len(elements)} elements)")
@@ -95,25 +2245,20 @@ class TechNewsScraper:
                         articles.append(article)
                 
                 if articles:
-                    break
+                    return articles, [selector]
         
-        return articles
+        return articles, []
 
-    def _try_headline_selectors(self, soup, site_url, domain, max_articles):
-        """Try headline-specific selectors"""
+    def _try_headline_selectors(self, soup, site_url, domain, max_articles, selectors=None):
+        """Try headline-specific selectors, returning (articles, selectors that contributed)"""
         articles = []
+        used_selectors = []
         
-        headline_selectors = [
-            'h1 a[href]', 'h2 a[href]', 'h3 a[href]',
-            '.headline a', '.title a', '.entry-title a',
-            '[class*="headline"] a', '[class*="title"] a',
-            'a[href*="/2024/"]', 'a[href*="/2025/"]',  # Year-based URLs
-        ]
-        
-        for selector in headline_selectors:
+        for selector in selectors or self.HEADLINE_SELECTORS:
             links = soup.select(selector)
             if len(links) >= 3:
                 logger.debug(f"Trying headline selector: {selector} (found {len(links)} links)")
+                used_selectors.append(selector)
                 
                 for link in links[:max_articles]:
                     article = self._create_article_from_link(link, site_url, domain)
@@ -123,7 +2268,7 @@ class TechNewsScraper:
                 if len(articles) >= 3:  # Good enough
                     break
         
-        return articles
+        return articles, used_selectors
 
     def _try_generic_link_patterns(self, soup, site_url, domain, max_articles):
         """Try to find article links using generic patterns"""
@@ -155,25 +2300,41 @@ class TechNewsScraper:
                     title=text[:100] + "..." if len(text) > 100 else text,
                     url=full_url,
                     summary="",
-                    published_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    published_date=datetime.now().replace(microsecond=0),
                     source=domain
                 )
                 articles.append(article)
         
         return articles
 
+    TITLE_SELECTORS = [
+        'h1 a', 'h2 a', 'h3 a', 'h4 a',
+        '.title a', '.headline a', '.entry-title a',
+        'a[href]'  # fallback
+    ]
+
+    SUMMARY_SELECTORS = [
+        '.excerpt', '.summary', '.description', '.intro',
+        'p', '.content'
+    ]
+
+    AUTHOR_SELECTORS = [
+        '.author', '.byline', '.writer', '[class*="author"]'
+    ]
+
+    _container_selectors = ContainerSelectors(TITLE_SELECTORS + SUMMARY_SELECTORS + AUTHOR_SELECTORS)
+
     def _extract_article_from_element(self, element, site_url, domain):
         """Extract article info from a container element"""
-        # Look for title/link
-        title_selectors = [
-            'h1 a', 'h2 a', 'h3 a', 'h4 a',
-            '.title a', '.headline a', '.entry-title a',
-            'a[href]'  # fallback
-        ]
+        if self.single_pass:
+            select_one = self._container_selectors.first_matches(element).get
+        else:
+            select_one = element.select_one
         
+        # Look for title/link
         link_elem = None
-        for selector in title_selectors:
-            link_elem = element.select_one(selector)
+        for selector in self.TITLE_SELECTORS:
+            link_elem = select_one(selector)
             if link_elem:
                 break
         
@@ -189,27 +2350,18 @@ class TechNewsScraper:
         full_url = urljoin(site_url, href) if not href.startswith('http') else href
         
         # Look for summary
-        summary_selectors = [
-            '.excerpt', '.summary', '.description', '.intro',
-            'p', '.content'
-        ]
-        
         summary = ""
-        for selector in summary_selectors:
-            summary_elem = element.select_one(selector)
+        for selector in self.SUMMARY_SELECTORS:
+            summary_elem = select_one(selector)
             if summary_elem:
                 summary = summary_elem.get_text(strip=True)
                 if len(summary) > 20:  # Only use if substantial
                     break
         
         # Look for author
-        author_selectors = [
-            '.author', '.byline', '.writer', '[class*="author"]'
-        ]
-        
         author = None
-        for selector in author_selectors:
-            author_elem = element.select_one(selector)
+        for selector in self.AUTHOR_SELECTORS:
+            author_elem = select_one(selector)
             if author_elem:
                 author = author_elem.get_text(strip=True)
                 break
@@ -218,7 +2370,7 @@ class TechNewsScraper:
             title=title,
             url=full_url,
             summary=summary[:200] + "..." if len(summary) > 200 else summary,
-            published_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            published_date=datetime.now().replace(microsecond=0),
             source=domain,
             author=author
         )
@@ -248,7 +2400,7 @@ class TechNewsScraper:
             title=title,
             url=full_url,
             summary=summary[:200] + "..." if len(summary) > 200 else summary,
-            published_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            published_date=datetime.now().replace(microsecond=0),
             source=domain
         )
 
@@ -285,9 +2437,9 @@ class TechNewsScraper:
         
         return not any(re.search(pattern, url, re.IGNORECASE) for pattern in skip_patterns)
 
-    def scrape_all_sites(self, max_articles_per_site: int = 5, site_type: str = "tech") -> Dict[str, List[Article]]:
+    def get_sites(self, site_type: str = "tech") -> List[str]:
         """
-        Scrape all configured news sites for the specified type
+        Return the configured news site URLs for the specified type
         """
         if site_type == "tech":
             sites = [
@@ -350,16 +2502,114 @@ class TechNewsScraper:
         else:
             raise ValueError(f"Unknown site_type: {site_type}. Supported types: tech, security, robotics, linux")
         
-        results = {}
+        return sites
+
+    def iter_sites(self, max_articles_per_site: int = 5, site_type: str = "tech",
+                   skip=()) -> Iterator[Tuple[str, List[Article]]]:
+        """
+        Scrape the configured sites of a type, yielding (domain, articles) as
+        each site finishes. With max_workers > 1 that is completion order,
+        not the configured order. Articles get site_type as their category.
+        Domains in skip are not scraped.
+        """
+        sites = [site for site in self.get_sites(site_type) if self._domain(site) not in skip]
+        
+        if self.max_workers > 1:
+            for domain, articles in self._iter_sites_concurrent(sites, max_articles_per_site):
+                yield domain, self._tag(articles, site_type)
+            return
         
         for site in sites:
             logger.info(f"Scraping {site}...")
-            articles = self.scrape_site_adaptive(site, max_articles_per_site)
-            domain = urlparse(site).netloc.replace('www.', '')
-            results[domain] = articles
-            
-            # Add some variety in delays to be more natural
-            time.sleep(self.delay + (time.time() % 1))
+            yield self._domain(site), self._tag(self.scrape_site_adaptive(site, max_articles_per_site), site_type)
+
+    @staticmethod
+    def _tag(articles: List[Article], category: str) -> List[Article]:
+        category = sys.intern(category)
+        for article in articles:
+            article.category = category
+        return articles
+
+    @staticmethod
+    def _domain(site_url: str) -> str:
+        return urlparse(site_url).netloc.replace('www.', '')
+
+    def _iter_sites_concurrent(self, sites: List[str], max_articles_per_site: int) -> Iterator[Tuple[str, List[Article]]]:
+        """
+        Scrape sites with a bounded thread pool, yielding each as it completes
+        """
+        pending = list(sites)
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Hand free workers the sites whose hosts are ready soonest, so
+                # no worker sleeps on a throttled host while another is ready
+                while pending and len(running) < self.max_workers:
+                    pending.sort(key=self.rate_limiter.ready_in)
+                    site = pending.pop(0)
+                    running[executor.submit(self.scrape_site_adaptive, site, max_articles_per_site)] = site
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    site = running.pop(future)
+                    try:
+                        articles = future.result()
+                    except Exception as e:
+                        logger.error(f"Error scraping {site}: {e}")
+                        articles = []
+                    yield self._domain(site), articles
+
+    def scrape_all_sites(self, max_articles_per_site: int = 5, site_type: str = "tech",
+                         only_new: bool = False, journal: Optional[str] = None) -> Dict[str, List[Article]]:
+        """
+        Scrape all configured news sites for the specified type
+
+        With a state directory, every result is added to the article store,
+        and articles not harvested in an earlier run get is_new set;
+        only_new drops the rest.
+
+        journal is an NDJSON file each finished site is appended to. If a
+        run is interrupted, the next one (within JOURNAL_MAX_AGE) picks up
+        the sites already in the journal and only scrapes the rest; the
+        journal is removed once every site is done.
+        """
+        scraped = {}
+        if journal and os.path.exists(journal):
+            if time.time() - os.path.getmtime(journal) < JOURNAL_MAX_AGE:
+                scraped = read_ndjson(journal, finished_only=True)
+                logger.info(f"Resuming {site_type} run: {len(scraped)} sites already done in {journal}")
+            else:
+                os.remove(journal)
+        
+        writer = NDJSONWriter(journal, append=True) if journal else None
+        try:
+            for domain, articles in self.iter_sites(max_articles_per_site, site_type, skip=scraped):
+                scraped[domain] = articles
+                if writer:
+                    writer.write_site(domain, articles)
+        finally:
+            if writer:
+                writer.close()
+        
+        # Keep the configured site order
+        results = {}
+        for site in self.get_sites(site_type):
+            domain = self._domain(site)
+            results[domain] = scraped.get(domain, [])
+        
+        if self.store:
+            stored = self.store.add(results, category=site_type)
+            logger.info(f"Added {stored} {site_type} articles to the article store")
+        
+        if self.seen:
+            new_count = self.seen.mark(results)
+            logger.info(f"{new_count} {site_type} articles were not seen in earlier runs")
+            if only_new:
+                results = {site: [a for a in articles if a.is_new] for site, articles in results.items()}
+        
+        if journal:
+            os.remove(journal)
         
         return results
 
@@ -368,8 +2618,8 @@ class TechNewsScraper:
         Debug function to help understand site structure
         """
         try:
-            response = self.session.get(site_url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self._fetch(site_url)
+            soup = self.parse_html(response.content)
             
             print(f"\n=== DEBUG INFO FOR {site_url} ===")
             
@@ -407,22 +2657,9 @@ class TechNewsScraper:
             if not filename.startswith('json/'):
                 filename = f"json/{filename}"
         
-        json_data = {}
-        for site, articles in articles_dict.items():
-            json_data[site] = [
-                {
-                    'title': article.title,
-                    'url': article.url,
-                    'summary': article.summary,
-                    'published_date': article.published_date,
-                    'source': article.source,
-                    'author': article.author
-                }
-                for article in articles
-            ]
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
+        with JSONWriter(filename) as writer:
+            for site, articles in articles_dict.items():
+                writer.write_site(site, articles)
         
         logger.info(f"Articles saved to {filename}")
         return filename
@@ -439,39 +2676,60 @@ class TechNewsScraper:
             if not filename.startswith('csv/'):
                 filename = f"csv/{filename}"
         
-        all_articles = []
-        for articles in articles_dict.values():
-            all_articles.extend(articles)
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Title', 'URL', 'Summary', 'Published Date', 'Source', 'Author'])
-            
-            for article in all_articles:
-                writer.writerow([
-                    article.title,
-                    article.url,
-                    article.summary,
-                    article.published_date,
-                    article.source,
-                    article.author
-                ])
+        with CSVWriter(filename) as writer:
+            for site, articles in articles_dict.items():
+                writer.write_site(site, articles)
         
         logger.info(f"Articles saved to {filename}")
         return filename
 
+    # Template variables per site type
+    REPORT_THEMES = {
+        "tech": {
+            "header_title": "🚀 Tech News",
+            "subtitle": "Latest articles from top technology news sources",
+            "theme_class": "tech-theme"
+        },
+        "security": {
+            "header_title": "🔒 Cybersecurity News",
+            "subtitle": "Latest cybersecurity articles from top security news sources",
+            "theme_class": "security-theme"
+        },
+        "robotics": {
+            "header_title": "🤖 Robotics News",
+            "subtitle": "Latest robotics articles from top robotics and automation sources",
+            "theme_class": "robotics-theme"
+        },
+        "linux": {
+            "header_title": "🐧 Linux News",
+            "subtitle": "Latest Linux and open source articles from top Linux news sources",
+            "theme_class": "linux-theme"
+        },
+        "combined": {
+            "header_title": "🔄 Combined News Report",
+            "subtitle": "Latest articles from multiple technology news categories",
+            "theme_class": "combined-theme"
+        }
+    }
+
+    _default_template = None
+
     def load_html_template(self, template_file: str = "news_template.html"):
         """Load HTML template from external file"""
+        return self.compiled_html_template(template_file).text
+
+    def compiled_html_template(self, template_file: str = "news_template.html") -> CompiledTemplate:
+        """The compiled template, re-read only when the file changes"""
         try:
-            with open(template_file, 'r', encoding='utf-8') as f:
-                return f.read()
+            return load_compiled_template(template_file)
         except FileNotFoundError:
             logger.warning(f"Template file {template_file} not found. Using default template.")
-            return self._get_default_html_template()
         except Exception as e:
             logger.error(f"Error loading template {template_file}: {e}")
-            return self._get_default_html_template()
-
+        
+        if TechNewsScraper._default_template is None:
+            TechNewsScraper._default_template = CompiledTemplate(self._get_default_html_template())
+        return TechNewsScraper._default_template
 
     def _get_default_html_template(self):
         """Return default HTML template as fallback"""
@@ -499,6 +2757,9 @@ class TechNewsScraper:
             .content {{ padding: 40px; }}
             .site-section {{ margin-bottom: 50px; }}
             .site-header {{ display: flex; align-items: center; margin-bottom: 25px; padding-bottom: 15px; border-bottom: 3px solid #f0f0f0; }}
+            summary.site-header {{ cursor: pointer; list-style: none; }}
+            summary.site-header::-webkit-details-marker {{ display: none; }}
+            details.site-section:not([open]) .site-header {{ margin-bottom: 0; }}
             .site-icon {{ width: 40px; height: 40px; border-radius: 50%; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); display: flex; align-items: center; justify-content: center; color: white; font-weight: bold; margin-right: 15px; font-size: 1.2rem; }}
             .robotics-prefix .site-icon {{ background: linear-gradient(135deg, #ff6b6b 0%, #ee5a52 100%); }}
             .linux-prefix .site-icon {{ background: linear-gradient(135deg, #f39c12 0%, #d68910 100%); }}
@@ -519,6 +2780,9 @@ class TechNewsScraper:
             .article-meta {{ display: flex; justify-content: space-between; align-items: center; font-size: 0.85rem; color: #999; border-top: 1px solid #f0f0f0; padding-top: 15px; }}
             .article-author {{ font-weight: 500; color: #667eea; }}
             .article-date {{ opacity: 0.8; }}
+            .article-alternates {{ font-size: 0.85rem; color: #888; margin-bottom: 15px; }}
+            .article-alternates a {{ color: #667eea; text-decoration: none; }}
+            .article-new {{ display: inline-block; background: #27ae60; color: white; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; padding: 2px 8px; border-radius: 10px; margin-right: 8px; vertical-align: middle; }}
             .no-articles {{ text-align: center; color: #999; font-style: italic; padding: 40px; background: #f9f9f9; border-radius: 10px; }}
             .footer {{ background: #f8f9fa; padding: 30px; text-align: center; color: #666; border-top: 1px solid #e0e0e0; }}
             .footer p {{ margin-bottom: 10px; }}
@@ -568,8 +2832,17 @@ class TechNewsScraper:
 
     def save_to_html(self, articles_dict: Dict[str, List[Article]], filename: str = None, 
                     file_prefix: str = "tech_news", template_file: str = "news_template.html",
-                    site_type: str = "tech"):
-        """Save articles to HTML file with styling using external template"""
+                    site_type: str = "tech", layout: str = "inline"):
+        """
+        Save articles to HTML file with styling using external template
+
+        layout "inline" puts every article card in the page; "sharded" writes
+        only the site headers and loads each site's cards from a JSON shard
+        when its section is opened.
+        """
+        if layout not in ("inline", "sharded"):
+            raise ValueError(f"Unknown layout: {layout}. Supported layouts: inline, sharded")
+        
         # Ensure html directory exists
         os.makedirs('html', exist_ok=True)
         
@@ -582,147 +2855,53 @@ class TechNewsScraper:
         
         total_articles = sum(len(articles) for articles in articles_dict.values())
         
-        # Load template
-        template = self.load_html_template(template_file)
-        
-        # Generate content for each site
-        content = ""
-        for site, articles in articles_dict.items():
-            # Handle prefixed site names for combined reports
-            if site.startswith(('tech_', 'security_', 'robotics_', 'linux_')):
-                prefix, actual_site = site.split('_', 1)
-                site_display = actual_site.replace('.com', '').replace('.', ' ').title()
-                site_class = f"{prefix}-prefix"
-                
-                # Add appropriate emoji based on prefix
-                emoji_map = {
-                    "tech": "🚀",
-                    "security": "🔒", 
-                    "robotics": "🤖",
-                    "linux": "🐧"
-                }
-                site_display = f"{emoji_map.get(prefix, '📰')} {site_display}"
-            else:
-                actual_site = site
-                site_display = site.replace('.com', '').replace('.', ' ').title()
-                site_class = ""
-                
-                # Add emoji based on site type
-                emoji_map = {
-                    "tech": "🚀",
-                    "security": "🔒",
-                    "robotics": "🤖", 
-                    "linux": "🐧"
-                }
-                site_display = f"{emoji_map.get(site_type, '📰')} {site_display}"
-            
-            site_initial = actual_site[0].upper()
-            
-            content += f"""
-            <div class="site-section {site_class}">
-                <div class="site-header">
-                    <div class="site-icon">{site_initial}</div>
-                    <h2 class="site-name">{site_display}</h2>
-                    <div class="article-count">{len(articles)} articles</div>
-                </div>
-    """
-            
-            if articles:
-                content += '<div class="articles-grid">'
-                
-                for article in articles:
-                    # Clean and truncate summary
-                    summary = article.summary.replace('\n', ' ').strip()
-                    if not summary:
-                        summary = "No summary available."
-                    
-                    # Format author display
-                    author_display = f'By {article.author}' if article.author else 'Unknown Author'
-                    
-                    # Format date
-                    try:
-                        date_obj = datetime.strptime(article.published_date, '%Y-%m-%d %H:%M:%S')
-                        formatted_date = date_obj.strftime('%b %d, %Y at %H:%M')
-                    except:
-                        formatted_date = article.published_date
-                    
-                    content += f"""
-                    <div class="article-card">
-                        <h3 class="article-title">
-                            <a href="{article.url}" target="_blank" rel="noopener noreferrer">
-                                {article.title}
-                            </a>
-                        </h3>
-                        <div class="article-summary">{summary}</div>
-                        <div class="article-meta">
-                            <span class="article-author">{author_display}</span>
-                            <span class="article-date">{formatted_date}</span>
-                        </div>
-                    </div>
-    """
-                
-                content += '</div>'
-            else:
-                content += '<div class="no-articles">No articles found for this source.</div>'
-            
-            content += '</div>'
-        
-        # Set template variables based on site type
-        theme_config = {
-            "tech": {
-                "header_title": "🚀 Tech News",
-                "subtitle": "Latest articles from top technology news sources",
-                "theme_class": "tech-theme"
-            },
-            "security": {
-                "header_title": "🔒 Cybersecurity News",
-                "subtitle": "Latest cybersecurity articles from top security news sources",
-                "theme_class": "security-theme"
-            },
-            "robotics": {
-                "header_title": "🤖 Robotics News",
-                "subtitle": "Latest robotics articles from top robotics and automation sources",
-                "theme_class": "robotics-theme"
-            },
-            "linux": {
-                "header_title": "🐧 Linux News",
-                "subtitle": "Latest Linux and open source articles from top Linux news sources",
-                "theme_class": "linux-theme"
-            },
-            "combined": {
-                "header_title": "🔄 Combined News Report",
-                "subtitle": "Latest articles from multiple technology news categories",
-                "theme_class": "combined-theme"
-            }
-        }
-        
-        config = theme_config.get(site_type, theme_config["tech"])
-        
-        # Fill template using string replacement to avoid curly brace issues
-        html_content = template
-        html_content = html_content.replace('{title}', f"{site_type.title()} News - {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        html_content = html_content.replace('{header_title}', config["header_title"])
-        html_content = html_content.replace('{subtitle}', config["subtitle"])
-        html_content = html_content.replace('{total_articles}', str(total_articles))
-        html_content = html_content.replace('{total_sources}', str(len(articles_dict)))
-        html_content = html_content.replace('{generation_time}', datetime.now().strftime('%H:%M'))
-        html_content = html_content.replace('{content}', content)
-        html_content = html_content.replace('{timestamp}', datetime.now().strftime('%A, %B %d, %Y at %H:%M:%S'))
-        html_content = html_content.replace('{theme_class}', config["theme_class"])
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        template = self.compiled_html_template(template_file)
+        values = self._report_values(site_type, total_articles, len(articles_dict))
+        hits = self.fragments.hits if self.fragments else 0
+        writer_class = ShardedReportWriter if layout == "sharded" else HTMLReportWriter
+        with writer_class(filename, template, values, site_type, self.fragments) as writer:
+            for site, articles in articles_dict.items():
+                writer.write_site(site, articles)
         
+        if self.fragments:
+            reused = self.fragments.hits - hits
+            logger.info(f"Reused {reused} of {sum(1 for a in articles_dict.values() if a)} site sections from the fragment cache")
+        if self.compact_output:
+            for shard_path in getattr(writer, 'shard_paths', []):
+                if not os.path.exists(shard_path + '.gz'):
+                    write_compressed_siblings(shard_path)
+            sizes = compact_report(filename)
+            served = sizes.get('br', sizes['gz'])
+            logger.info(f"Compacted {filename}: {sizes['original'] / 1024:.1f} KB -> {sizes['minified'] / 1024:.1f} KB "
+                        f"minified, {served / 1024:.1f} KB compressed ({sizes['original'] - served} bytes saved)")
         logger.info(f"HTML report saved to {filename}")
         return filename
 
+    def _report_values(self, site_type: str, total_articles: int, total_sources: int) -> Dict[str, str]:
+        """Template fields for a report page, apart from its content"""
+        config = self.REPORT_THEMES.get(site_type, self.REPORT_THEMES["tech"])
+        now = datetime.now()
+        return {
+            'title': f"{site_type.title()} News - {now.strftime('%Y-%m-%d %H:%M')}",
+            'header_title': config["header_title"],
+            'subtitle': config["subtitle"],
+            'total_articles': str(total_articles),
+            'total_sources': str(total_sources),
+            'generation_time': now.strftime('%H:%M'),
+            'timestamp': now.strftime('%A, %B %d, %Y at %H:%M:%S'),
+            'theme_class': config["theme_class"]
+        }
+
 
 def scrape_tech_news(max_articles_per_site: int = 5):
     """Scrape general tech news"""
-    scraper = TechNewsScraper(delay=2.0)
+    scraper = TechNewsScraper(delay=2.0, max_workers=8, cache_dir="cache/responses",
+                              state_dir="cache", compact_output=True)
     
     print("Starting tech news scraping...")
-    all_articles = scraper.scrape_all_sites(max_articles_per_site, site_type="tech")
+    all_articles = scraper.scrape_all_sites(max_articles_per_site, site_type="tech",
+                                            journal="cache/runs/tech.ndjson")
+    all_articles = StoryDeduplicator().dedupe(all_articles)
     
     total_articles = sum(len(articles) for articles in all_articles.values())
     
@@ -741,10 +2920,13 @@ def scrape_tech_news(max_articles_per_site: int = 5):
 
 def scrape_security_news(max_articles_per_site: int = 5):
     """Scrape cybersecurity news"""
-    scraper = TechNewsScraper(delay=2.0)
+    scraper = TechNewsScraper(delay=2.0, max_workers=8, cache_dir="cache/responses",
+                              state_dir="cache", compact_output=True)
     
     print("Starting cybersecurity news scraping...")
-    all_articles = scraper.scrape_all_sites(max_articles_per_site, site_type="security")
+    all_articles = scraper.scrape_all_sites(max_articles_per_site, site_type="security",
+                                            journal="cache/runs/security.ndjson")
+    all_articles = StoryDeduplicator().dedupe(all_articles)
     
     total_articles = sum(len(articles) for articles in all_articles.values())
     
@@ -764,10 +2946,13 @@ def scrape_security_news(max_articles_per_site: int = 5):
 
 def scrape_robotics_news(max_articles_per_site: int = 5):
     """Scrape robotics news"""
-    scraper = TechNewsScraper(delay=2.0)
+    scraper = TechNewsScraper(delay=2.0, max_workers=8, cache_dir="cache/responses",
+                              state_dir="cache", compact_output=True)
     
     print("Starting robotics news scraping...")
-    all_articles = scraper.scrape_all_sites(max_articles_per_site, site_type="robotics")
+    all_articles = scraper.scrape_all_sites(max_articles_per_site, site_type="robotics",
+                                            journal="cache/runs/robotics.ndjson")
+    all_articles = StoryDeduplicator().dedupe(all_articles)
     
     total_articles = sum(len(articles) for articles in all_articles.values())
     
@@ -787,10 +2972,13 @@ def scrape_robotics_news(max_articles_per_site: int = 5):
 
 def scrape_linux_news(max_articles_per_site: int = 5):
     """Scrape Linux news"""
-    scraper = TechNewsScraper(delay=2.0)
+    scraper = TechNewsScraper(delay=2.0, max_workers=8, cache_dir="cache/responses",
+                              state_dir="cache", compact_output=True)
     
     print("Starting Linux news scraping...")
-    all_articles = scraper.scrape_all_sites(max_articles_per_site, site_type="linux")
+    all_articles = scraper.scrape_all_sites(max_articles_per_site, site_type="linux",
+                                            journal="cache/runs/linux.ndjson")
+    all_articles = StoryDeduplicator().dedupe(all_articles)
     
     total_articles = sum(len(articles) for articles in all_articles.values())
     
@@ -808,6 +2996,51 @@ def scrape_linux_news(max_articles_per_site: int = 5):
     
     return all_articles
 
+def _timed_scrape(scrape_func, max_articles_per_site: int):
+    """Run one category scrape and return its articles with the wall time it took"""
+    start = time.monotonic()
+    articles = scrape_func(max_articles_per_site)
+    return articles, time.monotonic() - start
+
+def scrape_categories_parallel(categories: List[str], max_articles_per_site: int = 5) -> Dict[str, Dict[str, List[Article]]]:
+    """
+    Scrape several categories at once; their site lists share no hosts,
+    so the run takes about as long as the slowest category
+    """
+    category_scrapers = {
+        "tech": scrape_tech_news,
+        "security": scrape_security_news,
+        "robotics": scrape_robotics_news,
+        "linux": scrape_linux_news
+    }
+    
+    results = {}
+    timings = {}
+    start = time.monotonic()
+    
+    with ThreadPoolExecutor(max_workers=len(categories) or 1) as executor:
+        futures = {
+            executor.submit(_timed_scrape, category_scrapers[category], max_articles_per_site): category
+            for category in categories
+        }
+        for future in as_completed(futures):
+            category = futures[future]
+            try:
+                results[category], timings[category] = future.result()
+            except Exception as e:
+                logger.error(f"Error scraping {category} news: {e}")
+                results[category], timings[category] = {}, 0.0
+    
+    total_time = time.monotonic() - start
+    
+    print("\n⏱️  Category wall times:")
+    for category in categories:
+        print(f"  {category:<10} {timings[category]:6.1f}s")
+    print(f"  {'total':<10} {total_time:6.1f}s (sequential would be ~{sum(timings.values()):.1f}s)")
+    
+    # Keep the requested category order
+    return {category: results[category] for category in categories}
+
 def main():
     """
     Main function to run the scraper
@@ -846,10 +3079,11 @@ def main():
     
     elif choice == "5":
         print("\nScraping all news categories...")
-        tech_articles = scrape_tech_news()
-        security_articles = scrape_security_news()
-        robotics_articles = scrape_robotics_news()
-        linux_articles = scrape_linux_news()
+        results = scrape_categories_parallel(["tech", "security", "robotics", "linux"])
+        tech_articles = results["tech"]
+        security_articles = results["security"]
+        robotics_articles = results["robotics"]
+        linux_articles = results["linux"]
         
         tech_total = sum(len(articles) for articles in tech_articles.values())
         security_total = sum(len(articles) for articles in security_articles.values())
@@ -857,8 +3091,9 @@ def main():
         linux_total = sum(len(articles) for articles in linux_articles.values())
         
         # Create combined report
+        # The combined report repeats every category, so its cards load on demand
         combined_file = create_combined_report(tech_articles, security_articles, 
-                                             robotics_articles, linux_articles)
+                                             robotics_articles, linux_articles, layout="sharded")
         
         print(f"\n✅ All scraping completed!")
         print(f"Tech articles: {tech_total}")
@@ -867,6 +3102,9 @@ def main():
         print(f"Linux articles: {linux_total}")
         print(f"Total articles: {tech_total + security_total + robotics_total + linux_total}")
         print(f"Combined report: {combined_file}")
+        
+        print("\n🩺 Source health:")
+        SourceHealth("cache/health.json").print_summary()
     
     elif choice == "6":
         print("\nCustom selection:")
@@ -902,7 +3140,7 @@ def main():
         
         if all_results:
             # Create custom combined report
-            scraper = TechNewsScraper()
+            scraper = TechNewsScraper(state_dir="cache", compact_output=True)
             custom_file = scraper.save_to_html(
                 all_results,
                 filename=f"custom_news_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
@@ -920,11 +3158,16 @@ def main():
 def create_combined_report(tech_articles: Dict[str, List[Article]], 
                           security_articles: Dict[str, List[Article]],
                           robotics_articles: Dict[str, List[Article]],
-                          linux_articles: Dict[str, List[Article]]):
+                          linux_articles: Dict[str, List[Article]],
+                          layout: str = "inline"):
     """
     Create a combined HTML report with all news categories
+
+    layout "sharded" writes a small page of site headers plus one JSON
+    shard per site, fetched as sections are opened (see save_to_html).
     """
-    scraper = TechNewsScraper()
+    # The state directory brings the fragment cache the category reports filled
+    scraper = TechNewsScraper(state_dir="cache", compact_output=True)
     
     # Combine all articles
     combined_articles = {}
@@ -942,12 +3185,16 @@ def create_combined_report(tech_articles: Dict[str, List[Article]],
     for site, articles in linux_articles.items():
         combined_articles[f"linux_{site}"] = articles
     
+    # Stories often run in several outlets and in more than one category
+    combined_articles = StoryDeduplicator().dedupe(combined_articles)
+    
     # Save combined report
     html_file = scraper.save_to_html(
         combined_articles, 
         filename=f"combined_news_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
         file_prefix="combined_news",
-        site_type="combined"
+        site_type="combined",
+        layout=layout
     )
     
     return html_file
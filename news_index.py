@@ -0,0 +1,254 @@
+"""
+Build the report lists of news/index.html from a manifest of published reports.
+
+Usage:
+    python news_index.py            # publish new reports in news/
+    python news_index.py --rescan   # rebuild the manifest from the reports on disk
+
+news/index.json records which reports each section lists, newest first.
+New reports are the category reports in news/ that are not in the
+manifest yet. The section lists of index.html are regenerated from the
+manifest and the page is replaced in one atomic rename, so a failed run
+leaves the previous page in place. Without a manifest, the first run
+takes section membership from the links already on the page.
+
+The page only lists the newest LATEST_ENTRIES reports of each section.
+The rest are in one JSON file per section and month, news/months/
+<section>-<YYYY-MM>.json, holding that month's entries and the next
+older month; the "load older" button at the end of a list fetches them
+one month at a time. Publishing a report rewrites only its own month
+file, so page weight and update cost stay flat as the archive grows.
+
+Reports rolled into news/archive/ by news_archive.py stay in the manifest;
+their entries link to the archive viewer instead of the report file.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+from news_harvester import REPORT_FILE_RE, atomic_write, report_category
+
+NEWS_DIR = 'news'
+MANIFEST_VERSION = 1
+SITE_URL = 'https://cuanish.github.io/news'
+LATEST_ENTRIES = 10
+ARCHIVE_DIR = 'archive'
+
+SECTION_NAMES = {
+    'tech': 'Technology Updates',
+    'security': 'Security Updates',
+    'robotics': 'Robotics Updates',
+    'linux': 'Linux Updates',
+}
+
+ENTRY_TEMPLATE = '''                        <li>
+                            <a href="{url}" target="_blank">
+                                <span>{name}</span>
+                                <div>
+                                    <span class="news-date">{date}</span>
+                                    <i class="fas fa-external-link-alt news-arrow"></i>
+                                </div>
+                            </a>
+                        </li>'''
+
+LOAD_OLDER_TEMPLATE = '''                        <li class="load-older">
+                            <button type="button" data-section="{section}" data-name="{name}" data-month="{month}">[ LOAD OLDER: {month} ]</button>
+                        </li>'''
+
+_SECTION_OR_LINK_RE = re.compile(r'id="(\w+)-content"|href="[^"]*/news/(\w+\.html)"')
+
+def report_timestamp(filename: str) -> str:
+    """'20250908092253' for tech_news_20250908_092253.html, for sorting"""
+    match = REPORT_FILE_RE.match(filename)
+    return match.group(2) + match.group(3)
+
+def report_month(filename: str) -> str:
+    """'2025-09' for tech_news_20250908_092253.html"""
+    timestamp = report_timestamp(filename)
+    return f"{timestamp[:4]}-{timestamp[4:6]}"
+
+def entry_fields(filename: str, archived: bool = False) -> list:
+    """[url, display date] of a report, as stored in the month files"""
+    date = datetime.strptime(report_timestamp(filename)[:8], '%Y%m%d').strftime('%B %d, %Y')
+    if archived:
+        return [f"{SITE_URL}/{ARCHIVE_DIR}/view.html?report={filename}", date]
+    return [f"{SITE_URL}/{filename}", date]
+
+def render_entry(filename: str, section: str, archived: bool = False) -> str:
+    url, date = entry_fields(filename, archived)
+    return ENTRY_TEMPLATE.format(url=url, name=SECTION_NAMES[section], date=date)
+
+def linked_reports(page: str) -> dict:
+    """Report links on the page per section, read in a single scan"""
+    sections = {section: [] for section in SECTION_NAMES}
+    current = None
+    for match in _SECTION_OR_LINK_RE.finditer(page):
+        if match.group(1):
+            current = match.group(1) if match.group(1) in sections else None
+        elif current and report_category(match.group(2)):
+            sections[current].append(match.group(2))
+    return sections
+
+class NewsIndex:
+    """news/index.html and the manifest it is generated from"""
+
+    def __init__(self, news_dir: str = NEWS_DIR):
+        self.news_dir = news_dir
+        self.page_file = os.path.join(news_dir, 'index.html')
+        self.manifest_file = os.path.join(news_dir, 'index.json')
+        self.months_dir = os.path.join(news_dir, 'months')
+        with open(self.page_file, 'r', encoding='utf-8') as f:
+            self.page = f.read()
+
+        try:
+            with open(os.path.join(news_dir, ARCHIVE_DIR, 'index.json'), 'r', encoding='utf-8') as f:
+                self.archived = set(json.load(f).get('reports', {}))
+        except (OSError, ValueError):
+            self.archived = set()
+
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+        if manifest and manifest.get('version') == MANIFEST_VERSION:
+            self.sections = manifest['sections']
+            self.bootstrapped = False
+        else:
+            self.sections = linked_reports(self.page)
+            self.bootstrapped = True
+        self.published = {filename for reports in self.sections.values() for filename in reports}
+        # (section, month) pairs whose month file needs writing
+        self.changed_months = set()
+        if self.bootstrapped:
+            self._all_months_changed()
+
+    def _all_months_changed(self):
+        self.changed_months = {(section, report_month(filename))
+                               for section, reports in self.sections.items() for filename in reports}
+
+    def rescan(self):
+        """Forget the manifest; every report on disk is published again"""
+        self.sections = {section: [] for section in SECTION_NAMES}
+        self.published = set()
+        self.bootstrapped = True
+
+    def relink(self, filenames: list):
+        """Point the entries of newly archived reports at the archive viewer"""
+        for filename in filenames:
+            section = report_category(filename)
+            if section and filename in self.published:
+                self.archived.add(filename)
+                self.changed_months.add((section, report_month(filename)))
+
+    def new_reports(self) -> list:
+        """Category reports in news_dir or its archive missing from the manifest"""
+        on_disk = {entry.name for entry in os.scandir(self.news_dir) if report_category(entry.name)}
+        archived = {filename for filename in self.archived if report_category(filename)}
+        return sorted((on_disk | archived) - self.published, key=report_timestamp)
+
+    def publish(self, filenames: list) -> dict:
+        """Add reports to their sections; returns the added file names per section"""
+        added = {}
+        for filename in filenames:
+            section = report_category(filename)
+            added.setdefault(section, []).append(filename)
+            self.published.add(filename)
+            self.changed_months.add((section, report_month(filename)))
+        for section, reports in added.items():
+            self.sections[section] = sorted(self.sections[section] + reports, key=report_timestamp, reverse=True)
+        return added
+
+    def render_section(self, section: str) -> str:
+        """The newest entries of a section, then a button for the older months"""
+        reports = self.sections[section]
+        entries = [render_entry(filename, section, filename in self.archived) for filename in reports[:LATEST_ENTRIES]]
+        if len(reports) > LATEST_ENTRIES:
+            entries.append(LOAD_OLDER_TEMPLATE.format(section=section, name=SECTION_NAMES[section],
+                                                      month=report_month(reports[LATEST_ENTRIES])))
+        return '\n'.join(entries)
+
+    def month_files(self) -> dict:
+        """{path: content} of the changed month files"""
+        files = {}
+        for section in SECTION_NAMES:
+            by_month = {}
+            for filename in self.sections[section]:
+                by_month.setdefault(report_month(filename), []).append(filename)
+            months = list(by_month)  # newest first, like the reports
+            for position, month in enumerate(months):
+                if (section, month) not in self.changed_months:
+                    continue
+                older = months[position + 1] if position + 1 < len(months) else None
+                files[os.path.join(self.months_dir, f"{section}-{month}.json")] = json.dumps(
+                    {'entries': [entry_fields(filename, filename in self.archived) for filename in by_month[month]],
+                     'older': older},
+                    ensure_ascii=False, separators=(',', ':'))
+        return files
+
+    def render(self) -> str:
+        """The page with every section's news-list regenerated from the manifest"""
+        parts = []
+        position = 0
+        for section in SECTION_NAMES:
+            content = self.page.find(f'id="{section}-content"', position)
+            if content < 0:
+                raise ValueError(f"{self.page_file} has no {section} section")
+            start = self.page.index('<ul class="news-list">', content) + len('<ul class="news-list">')
+            end = self.page.index('</ul>', start)
+            parts += [self.page[position:start], '\n', self.render_section(section), '\n                    ']
+            position = end
+        parts.append(self.page[position:])
+        return ''.join(parts)
+
+    def save(self):
+        """Write the changed month files and the manifest, then swap the regenerated page in"""
+        page = self.render()
+        files = self.month_files()
+        files[self.manifest_file] = json.dumps({'version': MANIFEST_VERSION, 'sections': self.sections}, indent=2)
+        files[self.page_file] = page
+        os.makedirs(self.months_dir, exist_ok=True)
+        for path, text in files.items():
+            atomic_write(path, text)
+        self.page = page
+        self.changed_months = set()
+
+def main():
+    parser = argparse.ArgumentParser(description="Add new reports to the news index page")
+    parser.add_argument('news_dir', nargs='?', default=NEWS_DIR)
+    parser.add_argument('--rescan', action='store_true', help="rebuild the manifest from the reports on disk")
+    args = parser.parse_args()
+
+    try:
+        index = NewsIndex(args.news_dir)
+    except OSError as e:
+        print(f"❌ Error reading {os.path.join(args.news_dir, 'index.html')}: {e}")
+        sys.exit(1)
+    if args.rescan:
+        index.rescan()
+
+    added = index.publish(index.new_reports())
+    if not added and not index.bootstrapped:
+        print('ℹ️  No new entries to add')
+        return
+
+    try:
+        index.save()
+    except (OSError, ValueError) as e:
+        print(f"❌ Error updating {index.page_file}: {e}")
+        sys.exit(1)
+
+    print(f"✅ Successfully updated {index.page_file}")
+    if index.bootstrapped:
+        print(f"📋 Wrote the manifest {index.manifest_file}")
+    for section, reports in added.items():
+        print(f"🆕 {section}: {len(reports)} new entries")
+        for filename in reports:
+            print(f"   • {SECTION_NAMES[section]} ({filename})")
+    print(f"📊 Total new entries added: {sum(len(reports) for reports in added.values())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Query the harvested article history.
+
+Usage:
+    python news_query.py --category linux --source phoronix.com --month 2025-09
+    python news_query.py --search "kernel rust" --since 2025-08-01 --limit 20
+    python news_query.py --category security --format csv > security.csv
+    python news_query.py --counts source
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+
+from news_harvester import Article, ArticleStore
+
+DB_FILE = 'cache/articles.sqlite'
+
+def _next_month(month: str) -> str:
+    """'2025-09' -> '2025-10', the exclusive upper bound for a month filter"""
+    year, number = map(int, month.split('-'))
+    return f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+
+def print_articles(articles, output_format: str):
+    if output_format == 'json':
+        json.dump([article.to_dict() for article in articles], sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif output_format == 'csv':
+        writer = csv.writer(sys.stdout)
+        writer.writerow(Article.CSV_HEADER)
+        writer.writerows(article.to_row() for article in articles)
+    else:
+        for article in articles:
+            print(f"{article.published_date[:10]}  {article.source:<24} {article.title}")
+            print(f"{'':12}{article.url}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the harvested article history")
+    parser.add_argument('--db', default=DB_FILE, help="article store to read")
+    parser.add_argument('--source', help="site domain, e.g. phoronix.com")
+    parser.add_argument('--category', choices=['tech', 'security', 'robotics', 'linux'])
+    parser.add_argument('--since', help="earliest published date (YYYY-MM[-DD])")
+    parser.add_argument('--until', help="published before this date (YYYY-MM[-DD])")
+    parser.add_argument('--month', help="shorthand for --since YYYY-MM --until <next month>")
+    parser.add_argument('--search', help="words that must all appear in the title or summary")
+    parser.add_argument('--limit', type=int, default=50, help="0 for no limit")
+    parser.add_argument('--format', choices=['table', 'json', 'csv'], default='table')
+    parser.add_argument('--counts', choices=['source', 'category'], help="article counts instead of articles")
+    args = parser.parse_args()
+
+    store = ArticleStore(args.db)
+
+    if args.counts:
+        for value, count in store.counts(args.counts):
+            print(f"{count:>7}  {value}")
+        return
+
+    since, until = args.since, args.until
+    if args.month:
+        since, until = args.month, _next_month(args.month)
+
+    start = time.perf_counter()
+    articles = store.query(source=args.source, category=args.category, since=since, until=until,
+                           text=args.search, limit=args.limit)
+    elapsed = time.perf_counter() - start
+
+    print_articles(articles, args.format)
+    if args.format == 'table':
+        print(f"\n{len(articles)} articles in {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Build the client-side search index over the archived reports in news/.
+
+Usage:
+    python news_search.py            # index new reports in news/ (incremental)
+    python news_search.py --rebuild  # index every report from scratch
+
+Layout of news/search/:
+    manifest.json    reports already indexed, document count and a version
+                     hash per shard file (used to bust browser caches)
+    urls.json        {normalized article URL: doc id}, read by this script only
+    docs/<n>.json    [title, url, source, date, [reports]] per document,
+                     DOC_SHARD_SIZE documents per file in id order
+    terms/<ab>.json  {term: [doc id deltas]} for every term starting with
+                     "ab"; terms are the 2..MAX_PREFIX character prefixes of
+                     each word in the title, summary and source
+
+Each article is one document, however many daily reports carried it: a
+later report only adds its name to the document's reports. Adding a report
+rewrites the last docs shard, any new ones, the shards of documents it
+carried again and the terms shards its new articles' words fall into.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from news_archive import load_report, saved_reports
+from news_harvester import _STOPWORDS, _WORD_RE, atomic_write, normalize_article_url, report_category
+
+NEWS_DIR = 'news'
+INDEX_VERSION = 2
+DOC_SHARD_SIZE = 250
+MIN_PREFIX = 2
+MAX_PREFIX = 15
+
+def document_terms(article) -> set:
+    """Prefix terms of an article's title, summary and source domain"""
+    words = _WORD_RE.findall(f"{article.title} {article.summary}".lower())
+    # Domain labels without the top-level domain: "phoronix" for phoronix.com
+    words += article.source.lower().split('.')[:-1]
+    terms = set()
+    for word in words:
+        if word in _STOPWORDS or len(word) < MIN_PREFIX:
+            continue
+        terms.update(word[:length] for length in range(MIN_PREFIX, min(len(word), MAX_PREFIX) + 1))
+    return terms
+
+def _write_json(path: str, data) -> str:
+    """Write data compactly and atomically; return a short hash of the content"""
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    atomic_write(path, text)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:8]
+
+def _read_json(path: str, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+class SearchIndex:
+    """The sharded inverted index in news/search/, updated in place"""
+
+    def __init__(self, news_dir: str = NEWS_DIR):
+        self.news_dir = news_dir
+        self.index_dir = os.path.join(news_dir, 'search')
+        self.manifest = _read_json(os.path.join(self.index_dir, 'manifest.json'), None)
+        self.urls = _read_json(os.path.join(self.index_dir, 'urls.json'), {})
+        if not self.manifest or self.manifest.get('version') != INDEX_VERSION:
+            self.urls = {}
+            # The page drops stopwords from queries too, since they are never indexed as words
+            self.manifest = {'version': INDEX_VERSION, 'doc_shard_size': DOC_SHARD_SIZE, 'max_prefix': MAX_PREFIX,
+                             'stopwords': sorted(_STOPWORDS), 'documents': 0, 'reports': {},
+                             'doc_shards': {}, 'term_shards': {}}
+
+    def pending_reports(self) -> list:
+        """Category reports in news_dir or its archive that are not indexed yet, oldest first"""
+        reports = [name for name in saved_reports(self.news_dir)
+                   if report_category(name) and name not in self.manifest['reports']]
+        # Report file names end in _YYYYMMDD_HHMMSS
+        return sorted(reports, key=lambda name: name[-20:])
+
+    def add_reports(self, names: list) -> int:
+        """Index the articles of the given reports; returns the number of new documents"""
+        first_id = self.manifest['documents']
+        documents = []
+        postings = {}
+        # Reports that carried an already indexed document again, per doc id
+        repeated = {}
+
+        for report in names:
+            new_documents = 0
+            for article in load_report(self.news_dir, report):
+                key = normalize_article_url(article.url)
+                doc_id = self.urls.get(key)
+                if doc_id is not None:
+                    reports = documents[doc_id - first_id][4] if doc_id >= first_id else repeated.setdefault(doc_id, [])
+                    if report not in reports:
+                        reports.append(report)
+                    continue
+                doc_id = self.urls[key] = first_id + len(documents)
+                new_documents += 1
+                documents.append([article.title, article.url, article.source,
+                                  article.published.strftime('%Y-%m-%d') if article.published else '', [report]])
+                for term in document_terms(article):
+                    postings.setdefault(term[:MIN_PREFIX], {}).setdefault(term, []).append(doc_id)
+            self.manifest['reports'][report] = new_documents
+
+        if not documents and not repeated:
+            self.save()
+            return 0
+
+        os.makedirs(os.path.join(self.index_dir, 'docs'), exist_ok=True)
+        os.makedirs(os.path.join(self.index_dir, 'terms'), exist_ok=True)
+
+        # Documents: update the shards of repeated ones, top up the last shard, then start new ones
+        shards = {doc_id // DOC_SHARD_SIZE for doc_id in repeated}
+        if documents:
+            shards.update(range(first_id // DOC_SHARD_SIZE, (first_id + len(documents) - 1) // DOC_SHARD_SIZE + 1))
+        for shard in sorted(shards):
+            path = os.path.join(self.index_dir, 'docs', f"{shard}.json")
+            existing = _read_json(path, []) if shard * DOC_SHARD_SIZE < first_id else []
+            for position, document in enumerate(existing):
+                document[4].extend(repeated.get(shard * DOC_SHARD_SIZE + position, []))
+            start = shard * DOC_SHARD_SIZE + len(existing) - first_id
+            end = (shard + 1) * DOC_SHARD_SIZE - first_id
+            self.manifest['doc_shards'][str(shard)] = _write_json(path, existing + documents[start:end])
+
+        # Terms: ids only grow, so new ids append to the delta-encoded lists
+        for shard, terms in postings.items():
+            path = os.path.join(self.index_dir, 'terms', f"{shard}.json")
+            existing = _read_json(path, {}) if shard in self.manifest['term_shards'] else {}
+            for term, doc_ids in terms.items():
+                deltas = existing.setdefault(term, [])
+                last_id = sum(deltas) if deltas else 0
+                for doc_id in doc_ids:
+                    deltas.append(doc_id - last_id)
+                    last_id = doc_id
+            self.manifest['term_shards'][shard] = _write_json(path, existing)
+
+        self.manifest['documents'] = first_id + len(documents)
+        self.save()
+        return len(documents)
+
+    def save(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        _write_json(os.path.join(self.index_dir, 'urls.json'), self.urls)
+        _write_json(os.path.join(self.index_dir, 'manifest.json'), self.manifest)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the search index over the archived news reports")
+    parser.add_argument('news_dir', nargs='?', default=NEWS_DIR)
+    parser.add_argument('--rebuild', action='store_true', help="discard the index and index every report")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        shutil.rmtree(os.path.join(args.news_dir, 'search'), ignore_errors=True)
+
+    index = SearchIndex(args.news_dir)
+    pending = index.pending_reports()
+    start = time.perf_counter()
+    added = index.add_reports(pending)
+    elapsed = time.perf_counter() - start
+
+    print(f"🔎 Indexed {len(pending)} new reports ({added} new articles) in {elapsed:.1f}s; "
+          f"{index.manifest['documents']} articles in {len(index.manifest['reports'])} reports, "
+          f"{len(index.manifest['term_shards'])} term shards")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Single-pass extraction must return exactly what one soupsieve pass per
+selector returns. The fixtures cover each strategy of the cascade:
+article containers, headline links and generic article-like links.
+
+Run with: python -m unittest discover tests
+"""
+import glob
+import os
+import unittest
+
+from news_harvester import TechNewsScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def _fields(articles):
+    return [(a.title, a.url, a.summary, a.author) for a in articles]
+
+class SinglePassExtractionTest(unittest.TestCase):
+    def setUp(self):
+        self.single_pass = TechNewsScraper(single_pass=True)
+        self.per_selector = TechNewsScraper(single_pass=False)
+        self.fixtures = sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+
+    def test_fixtures_present(self):
+        self.assertGreaterEqual(len(self.fixtures), 4)
+
+    def test_same_articles_as_per_selector(self):
+        for path in self.fixtures:
+            with open(path, 'rb') as f:
+                soup = self.single_pass.parse_html(f.read())
+            for max_articles in (3, 5, 10):
+                with self.subTest(fixture=os.path.basename(path), max_articles=max_articles):
+                    expected = self.per_selector.extract_articles(soup, 'https://example.com', 'example.com',
+                                                                  max_articles)
+                    actual = self.single_pass.extract_articles(soup, 'https://example.com', 'example.com',
+                                                               max_articles)
+                    self.assertTrue(expected, "fixture should yield articles")
+                    self.assertEqual(_fields(actual), _fields(expected))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+parse_feed reads RSS 2.0, Atom and Google News sitemaps into the same
+Articles, within max_articles.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import unittest
+from datetime import datetime, timezone
+
+from news_harvester import parse_feed
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def _load(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+        return f.read()
+
+def _local(*args, **kwargs):
+    """A UTC time as the naive local datetime parse_feed returns"""
+    return datetime(*args, tzinfo=timezone.utc, **kwargs).astimezone().replace(tzinfo=None)
+
+class ParseFeedTest(unittest.TestCase):
+    def test_rss(self):
+        articles = parse_feed(_load('feed-rss.xml'), 'example.com', 10)
+        self.assertEqual([a.url for a in articles], ['https://example.com/2025/09/kernel-6-17',
+                                                     'https://example.com/2025/09/rust-drivers',
+                                                     'https://example.com/2025/09/third'])
+        first = articles[0]
+        self.assertEqual(first.title, 'Kernel 6.17 released with scheduler changes')
+        self.assertEqual(first.summary, 'The new kernel brings a reworked scheduler.')
+        self.assertEqual(first.author, 'Jane Writer')
+        self.assertEqual(first.source, 'example.com')
+        self.assertEqual(first.published, _local(2025, 9, 8, 12))
+        self.assertEqual(articles[1].summary, 'Two Rust drivers were merged.')
+        # Items without a date still get one
+        self.assertIsNotNone(articles[2].published)
+
+    def test_atom(self):
+        articles = parse_feed(_load('feed-atom.xml'), 'example.org', 10)
+        self.assertEqual([a.title for a in articles], ['Humanoid robot learns to fold laundry',
+                                                       'Warehouse arms get faster grippers'])
+        first = articles[0]
+        # The alternate link, not the replies one; published before updated
+        self.assertEqual(first.url, 'https://example.org/humanoid-laundry')
+        self.assertEqual(first.published, _local(2025, 9, 8, 12))
+        self.assertEqual(first.author, 'Sam Roboticist')
+        self.assertEqual(first.summary, 'A household robot demo.')
+        self.assertEqual(articles[1].url, 'https://example.org/grippers')
+        self.assertEqual(articles[1].published, _local(2025, 9, 7, 4, 15))
+
+    def test_news_sitemap(self):
+        articles = parse_feed(_load('news-sitemap.xml'), 'example.net', 10)
+        self.assertEqual([(a.title, a.url) for a in articles], [
+            ('Browser zero-day patched after active exploitation', 'https://example.net/security/zero-day'),
+            ('Ransomware group targets hospitals', 'https://example.net/security/ransomware'),
+        ])
+        self.assertEqual(articles[0].published, _local(2025, 9, 8, 12))
+        # The publication name is not an author
+        self.assertIsNone(articles[0].author)
+
+    def test_max_articles(self):
+        for name in ('feed-rss.xml', 'feed-atom.xml', 'news-sitemap.xml'):
+            with self.subTest(fixture=name):
+                self.assertEqual(len(parse_feed(_load(name), 'example.com', 1)), 1)
+
+    def test_not_a_feed(self):
+        self.assertEqual(parse_feed(b'<html><body><p>Hello</p></body></html>', 'example.com', 10), [])
+
+if __name__ == '__main__':
+    unittest.main()
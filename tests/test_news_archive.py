@@ -0,0 +1,113 @@
+"""
+ReportArchive appends reports to news/archive/<YYYY-MM>.gz as separate
+gzip members and reads each one back from its index entry alone.
+
+Run with: python -m unittest discover tests
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from news_archive import ReportArchive, load_report, saved_reports
+from news_harvester import Article, HTMLReportWriter, TechNewsScraper, read_report
+
+TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'news_template.html')
+
+def _fields(articles):
+    return [(a.title, a.url, a.source, a.published_date) for a in articles]
+
+class ReportArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.news_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.news_dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.news_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def _write_report(self, name, articles_dict):
+        scraper = TechNewsScraper()
+        template = scraper.compiled_html_template(TEMPLATE_FILE)
+        values = scraper._report_values('tech', sum(map(len, articles_dict.values())), len(articles_dict))
+        path = os.path.join(self.news_dir, name)
+        with HTMLReportWriter(path, template, values, 'tech') as writer:
+            for site, articles in articles_dict.items():
+                writer.write_site(site, articles)
+        return path
+
+    def test_add_and_read_back(self):
+        reports = {
+            'tech_news_20250830_080000.html': b'<html>august</html>' * 50,
+            'linux_news_20250901_080000.html': b'<html>september</html>' * 80,
+            'combined_news_report_20250902_080000.html': b'<html>combined</html>' * 20,
+        }
+        paths = [self._write(name, content) for name, content in reports.items()]
+        self._write('tech_news_20250830_080000.html.gz', b'stale copy')
+
+        archive = ReportArchive(self.news_dir)
+        archive.add(paths)
+
+        for name in reports:
+            self.assertFalse(os.path.exists(os.path.join(self.news_dir, name)))
+        self.assertFalse(os.path.exists(os.path.join(self.news_dir, 'tech_news_20250830_080000.html.gz')))
+        self.assertEqual(sorted(os.listdir(archive.archive_dir)), ['2025-08.gz', '2025-09.gz', 'index.json'])
+
+        # A fresh instance finds every report through the saved index
+        archive = ReportArchive(self.news_dir)
+        for name, content in reports.items():
+            with self.subTest(report=name):
+                self.assertEqual(archive.read(name), content)
+                self.assertEqual(archive.reports[name][3], len(content))
+
+        # The month file as a whole is still one gzip stream
+        with gzip.open(os.path.join(archive.archive_dir, '2025-09.gz'), 'rb') as f:
+            self.assertEqual(f.read(), reports['linux_news_20250901_080000.html'] +
+                             reports['combined_news_report_20250902_080000.html'])
+
+    def test_later_adds_append(self):
+        first = self._write('tech_news_20250903_080000.html', b'first')
+        ReportArchive(self.news_dir).add([first])
+        second = self._write('tech_news_20250904_080000.html', b'second')
+        archive = ReportArchive(self.news_dir)
+        archive.add([second])
+
+        archive = ReportArchive(self.news_dir)
+        first_entry = archive.reports['tech_news_20250903_080000.html']
+        second_entry = archive.reports['tech_news_20250904_080000.html']
+        self.assertEqual(second_entry[1], first_entry[1] + first_entry[2])
+        self.assertEqual(archive.read('tech_news_20250903_080000.html'), b'first')
+        self.assertEqual(archive.read('tech_news_20250904_080000.html'), b'second')
+
+    def test_unknown_report(self):
+        with self.assertRaises(KeyError):
+            ReportArchive(self.news_dir).read('tech_news_20250905_080000.html')
+
+    def test_expired_reports(self):
+        old = self._write('tech_news_20250101_080000.html', b'old')
+        self._write(f"tech_news_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html", b'new')
+        self._write('index.html', b'page')
+        self.assertEqual(ReportArchive(self.news_dir).expired_reports(30), [old])
+
+    def test_saved_reports_and_load_report(self):
+        articles = {'example.com': [Article('Kernel 6.17 released', 'https://example.com/kernel', 'Summary',
+                                            datetime(2025, 9, 6, 12, 1), 'example.com')],
+                    'example.org': [Article('Robot folds laundry', 'https://example.org/robot', '',
+                                            datetime(2025, 9, 6, 9, 30), 'example.org', author='Sam')]}
+        path = self._write_report('tech_news_20250906_080000.html', articles)
+        expected = read_report(path)
+        self.assertEqual(len(expected), 2)
+        size = os.path.getsize(path)
+        self._write('linux_news_20250907_080000.html', b'<html></html>')
+
+        ReportArchive(self.news_dir).add([path])
+        self.assertEqual(saved_reports(self.news_dir), {'tech_news_20250906_080000.html': size,
+                                                        'linux_news_20250907_080000.html': 13})
+        self.assertEqual(_fields(load_report(self.news_dir, 'tech_news_20250906_080000.html')), _fields(expected))
+
+if __name__ == '__main__':
+    unittest.main()
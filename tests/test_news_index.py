@@ -0,0 +1,99 @@
+"""
+NewsIndex publishes reports into the section lists of news/index.html and
+writes one JSON file per section and month for the "load older" button,
+rewriting only the months that changed.
+
+Run with: python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from news_index import LATEST_ENTRIES, SECTION_NAMES, SITE_URL, NewsIndex
+
+PAGE = '<html><body>\n{}\n</body></html>\n'.format('\n'.join(
+    f'<div id="{section}-content">\n<ul class="news-list">\n</ul>\n</div>' for section in SECTION_NAMES))
+
+def _report(section, day, month=9):
+    return f"{section}_news_2025{month:02d}{day:02d}_080000.html"
+
+class NewsIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.news_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.news_dir)
+        with open(os.path.join(self.news_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(PAGE)
+
+    def _touch(self, *names):
+        for name in names:
+            open(os.path.join(self.news_dir, name), 'w').close()
+
+    def _month_file(self, section, month):
+        with open(os.path.join(self.news_dir, 'months', f"{section}-{month}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_publish_sorts_newest_first(self):
+        index = NewsIndex(self.news_dir)
+        added = index.publish([_report('tech', 2), _report('linux', 5), _report('tech', 9)])
+        self.assertEqual(added, {'tech': [_report('tech', 2), _report('tech', 9)], 'linux': [_report('linux', 5)]})
+        self.assertEqual(index.sections['tech'], [_report('tech', 9), _report('tech', 2)])
+        self.assertEqual(index.sections['security'], [])
+
+    def test_new_reports_skips_published_and_other_files(self):
+        self._touch(_report('tech', 1), _report('security', 2), 'combined_news_report_20250902_080000.html',
+                    'styles.css')
+        index = NewsIndex(self.news_dir)
+        index.publish(index.new_reports())
+        index.save()
+
+        self._touch(_report('tech', 3))
+        index = NewsIndex(self.news_dir)
+        self.assertFalse(index.bootstrapped)
+        self.assertEqual(index.new_reports(), [_report('tech', 3)])
+
+    def test_month_files_only_for_changed_months(self):
+        index = NewsIndex(self.news_dir)
+        index.publish([_report('tech', 20, month=8), _report('tech', 1), _report('tech', 2)])
+        files = index.month_files()
+        self.assertEqual(sorted(os.path.basename(path) for path in files), ['tech-2025-08.json', 'tech-2025-09.json'])
+        index.save()
+
+        september = self._month_file('tech', '2025-09')
+        self.assertEqual(september['older'], '2025-08')
+        self.assertEqual(september['entries'], [[f"{SITE_URL}/{_report('tech', 2)}", 'September 02, 2025'],
+                                                [f"{SITE_URL}/{_report('tech', 1)}", 'September 01, 2025']])
+        self.assertIsNone(self._month_file('tech', '2025-08')['older'])
+
+        # A later report only rewrites its own month
+        index = NewsIndex(self.news_dir)
+        index.publish([_report('tech', 3)])
+        self.assertEqual([os.path.basename(path) for path in index.month_files()], ['tech-2025-09.json'])
+
+    def test_page_lists_latest_entries_then_load_older(self):
+        index = NewsIndex(self.news_dir)
+        reports = [_report('linux', day) for day in range(1, LATEST_ENTRIES + 3)]
+        index.publish(reports)
+        index.save()
+
+        with open(os.path.join(self.news_dir, 'index.html'), 'r', encoding='utf-8') as f:
+            page = f.read()
+        linked = [report for report in reports if f"{SITE_URL}/{report}" in page]
+        self.assertEqual(linked, reports[-LATEST_ENTRIES:])
+        self.assertIn('data-section="linux"', page)
+        self.assertIn('data-month="2025-09"', page)
+
+    def test_archived_reports_link_to_the_viewer(self):
+        index = NewsIndex(self.news_dir)
+        index.publish([_report('robotics', 4)])
+        index.save()
+
+        index = NewsIndex(self.news_dir)
+        index.relink([_report('robotics', 4)])
+        index.save()
+        entry = self._month_file('robotics', '2025-09')['entries'][0]
+        self.assertEqual(entry[0], f"{SITE_URL}/archive/view.html?report={_report('robotics', 4)}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+ResponseCache evicts expired entries and trims to max_size_bytes when it
+is built. The category scrapers build theirs on the same directory at the
+same time, so eviction has to survive files vanishing under it.
+
+Run with: python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from news_harvester import ResponseCache
+
+class ResponseCacheEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def _entry(self, name, age_days=0.0, size=10):
+        path = os.path.join(self.cache_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('x' * size)
+        mtime = time.time() - age_days * 86400
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_expired_and_temporary_files_removed(self):
+        self._entry('old.json', age_days=10)
+        self._entry('fresh.json', age_days=1)
+        self._entry('fresh.json.123.456.tmp')
+        ResponseCache(self.cache_dir, max_age_days=7)
+        self.assertEqual(os.listdir(self.cache_dir), ['fresh.json'])
+
+    def test_trims_oldest_to_max_size(self):
+        for age in range(5):
+            self._entry(f"{age}.json", age_days=age, size=100)
+        ResponseCache(self.cache_dir, max_size_bytes=250)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['0.json', '1.json'])
+
+    def test_concurrent_construction(self):
+        for number in range(2000):
+            self._entry(f"expired-{number}.json", age_days=30)
+        for number in range(20):
+            self._entry(f"fresh-{number}.json")
+
+        errors = []
+        start = threading.Barrier(20)
+
+        def construct():
+            start.wait()
+            try:
+                ResponseCache(self.cache_dir)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=construct) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), sorted(f"fresh-{number}.json" for number in range(20)))
+
+if __name__ == '__main__':
+    unittest.main()